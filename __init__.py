@@ -11,8 +11,9 @@ except ImportError:
     __version__ = "?.?.?"
 
 # Import Nodes
-from .h4_traffic import H4_TrafficCop, H4_TrafficMerge, H4_TrafficRouter, H4_StateMonitor, H4_LoopIncrementer, H4_WirelessResetButton, H4_ImageBuffer
+from .h4_traffic import H4_TrafficCop, H4_TrafficMerge, H4_TrafficRouter, H4_StateMonitor, H4_LoopIncrementer, H4_WirelessResetButton, H4_ImageBuffer, H4_LatentDecodeEveryN, H4_PhaseRouter
 from .h4_context import H4_ContextHub, H4_ContextUnpack
+from .h4_pipe_ops import H4_PipeResidency, H4_PipeSave, H4_PipeLoad
 from .h4_smart_debug import H4_SmartConsole
 from .h4_mission_control import H4_MissionControl, H4_LinearScheduler, H4_SeedGenerator
 from .h4_gridinator import H4_Gridinator
@@ -22,6 +23,12 @@ from .h4_datastream import H4_DataStream
 from .h4_axis import H4_AxisDriver
 from .h4_varianator import H4_Varianator
 from .h4_seed_sequencer import H4_SeedSequencer
+from .h4_checkpoint import H4_LoopCheckpoint
+from .h4_history import H4_FrameHistory
+from .h4_loop_driver import H4_LoopStart, H4_LoopEnd
+from .h4_schedule import H4_ScheduleCompiler, H4_ScheduleRead
+from .h4_convergence import H4_ConvergenceMonitor
+from .h4_memo import H4_Memo
 
 # FaceForge Module (AIO Face Swap Suite)
 from .h4_faceforge import (
@@ -37,9 +44,13 @@ NODE_CLASS_MAPPINGS = {
     "H4_TrafficCop": H4_TrafficCop,
     "H4_TrafficMerge": H4_TrafficMerge,
     "H4_TrafficRouter": H4_TrafficRouter,
+    "H4_PhaseRouter": H4_PhaseRouter,
     "H4_StateMonitor": H4_StateMonitor,
     "H4_ContextHub": H4_ContextHub,
     "H4_ContextUnpack": H4_ContextUnpack,
+    "H4_PipeResidency": H4_PipeResidency,
+    "H4_PipeSave": H4_PipeSave,
+    "H4_PipeLoad": H4_PipeLoad,
     "H4_SmartConsole": H4_SmartConsole,
     "H4_MissionControl": H4_MissionControl,
     "H4_LinearScheduler": H4_LinearScheduler,
@@ -47,6 +58,7 @@ NODE_CLASS_MAPPINGS = {
     "H4_LoopIncrementer": H4_LoopIncrementer,
     "H4_WirelessResetButton": H4_WirelessResetButton,
     "H4_ImageBuffer": H4_ImageBuffer,
+    "H4_LatentDecodeEveryN": H4_LatentDecodeEveryN,
     "H4_Gridinator": H4_Gridinator,
     "H4_DebugErrorGenerator": H4_DebugErrorGenerator,
     "H4_Discombobulator": H4_Discombobulator,
@@ -54,6 +66,14 @@ NODE_CLASS_MAPPINGS = {
     "H4_AxisDriver": H4_AxisDriver,
     "H4_Varianator": H4_Varianator,
     "H4_SeedSequencer": H4_SeedSequencer,
+    "H4_LoopCheckpoint": H4_LoopCheckpoint,
+    "H4_FrameHistory": H4_FrameHistory,
+    "H4_LoopStart": H4_LoopStart,
+    "H4_LoopEnd": H4_LoopEnd,
+    "H4_ScheduleCompiler": H4_ScheduleCompiler,
+    "H4_ScheduleRead": H4_ScheduleRead,
+    "H4_ConvergenceMonitor": H4_ConvergenceMonitor,
+    "H4_Memo": H4_Memo,
     # FaceForge Suite
     **FACEFORGE_CLASS_MAPPINGS,
 }
@@ -62,9 +82,13 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "H4_TrafficCop": "h4 Traffic Cop (Live Logic)",
     "H4_TrafficMerge": "h4 Traffic Merge (Safe Select)",
     "H4_TrafficRouter": "h4 Traffic Router (The Nexus)",
+    "H4_PhaseRouter": "h4 Phase Router (N-Way)",
     "H4_StateMonitor": "h4 State Monitor",
     "H4_ContextHub": "h4 Context Hub (Mothership)",
     "H4_ContextUnpack": "h4 Context Unpack (Distributor)",
+    "H4_PipeResidency": "h4 Pipe Residency (Bulk Move)",
+    "H4_PipeSave": "h4 Pipe Save (Disk)",
+    "H4_PipeLoad": "h4 Pipe Load (Memory-Mapped)",
     "H4_SmartConsole": "{h4 - DEBUGGER} - Inline Debugger {Smart Console}",
     "H4_MissionControl": "h4 Mission Control (Dashboard)",
     "H4_LinearScheduler": "h4 Linear Scheduler (Signal Gen)",
@@ -72,6 +96,7 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "H4_LoopIncrementer": "h4 Loop Incrementer (Hybrid)",
     "H4_WirelessResetButton": "h4 Wireless Reset (Toggle)",
     "H4_ImageBuffer": "h4 Image Buffer (Anti-Lag)",
+    "H4_LatentDecodeEveryN": "h4 Latent Decode (Every N)",
     "H4_Gridinator": "h4 - Gridinator 9001",
     "H4_DebugErrorGenerator": "🔬 h4 Debug Error (TEST ONLY)",
     "H4_Discombobulator": "The Discombobulator (Use with CAUTION)",
@@ -79,12 +104,25 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "H4_AxisDriver": "h4 Axis Driver (Grid Tools)",
     "H4_Varianator": "h4 Varianator (Latent Riffler)",
     "H4_SeedSequencer": "h4 Seed Sequencer (Chaos Control)",
+    "H4_LoopCheckpoint": "h4 Loop Checkpoint (Crash Safe)",
+    "H4_FrameHistory": "h4 Frame History (Ring Buffer)",
+    "H4_LoopStart": "h4 Loop Start (Driver)",
+    "H4_LoopEnd": "h4 Loop End (Driver)",
+    "H4_ScheduleCompiler": "h4 Schedule Compiler (Signal Gen)",
+    "H4_ScheduleRead": "h4 Schedule Read (Signal Gen)",
+    "H4_ConvergenceMonitor": "h4 Convergence Monitor (Early Stop)",
+    "H4_Memo": "h4 Memo (Result Cache)",
     # FaceForge Suite
     **FACEFORGE_DISPLAY_MAPPINGS,
 }
 
 WEB_DIRECTORY = "./js"
 
+# Opt-in profiler (H4_METRICS=1): wraps every node FUNCTION, served at /h4/metrics
+from .h4_metrics import metrics_enabled, instrument_nodes
+if metrics_enabled():
+    instrument_nodes(NODE_CLASS_MAPPINGS)
+
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
 
 # ------------------------------------------------------------------------------
@@ -0,0 +1,297 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_checkpoint.py
+# ------------------------------------------------------------------------------
+# H4 Loop Checkpoint (Crash Safe)
+# Rule 1 (No Placeholders): Full snapshot + restore of loop state and buffers.
+# Rule 11 (Logging): Every save / restore is logged with its location.
+# Rule 20 (Clairvoyant Development): Writes happen on a background thread and
+# are atomic (write-then-rename), so a crash mid-save never corrupts the last
+# good checkpoint.
+# ------------------------------------------------------------------------------
+import json
+import os
+import threading
+import time
+
+from server import PromptServer
+from aiohttp import web
+
+from .h4_core import _log, get_state_snapshot, snapshot_all, load_snapshot, export_buffer, buffer_image, resolve_loop_name
+from .h4_tensor_io import save_payload, load_payload, is_spillable, map_tensors
+from .h4_utils import ANY_TYPE, LOOP_NAME_INPUT
+
+STATE_FILE = "state.json"
+BUFFER_FILE = "buffer.safetensors"
+
+
+def _checkpoint_root():
+    path = os.environ.get("H4_CHECKPOINT_DIR", "")
+    if not path:
+        try:
+            import folder_paths
+            base = folder_paths.get_output_directory()
+        except Exception:
+            base = os.path.expanduser("~")
+        path = os.path.join(base, "h4_checkpoints")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _safe_name(name):
+    cleaned = "".join(c for c in str(name).strip() if c.isalnum() or c in "-_.")
+    # No leading dots: "." / ".." would resolve to the root itself or its parent.
+    return cleaned.lstrip(".") or "h4_loop"
+
+
+def _checkpoint_folder(name):
+    """<root>/<name>, refusing anything that resolves outside the checkpoint root."""
+    root = os.path.realpath(_checkpoint_root())
+    folder = os.path.realpath(os.path.join(root, _safe_name(name)))
+    if os.path.commonpath([root, folder]) != root or folder == root:
+        raise ValueError(f"Checkpoint name '{name}' points outside {root}")
+    return folder
+
+
+def _json_safe(mapping):
+    """Drops orbit values that cannot round-trip through JSON (models, tensors...)."""
+    safe = {}
+    for k, v in mapping.items():
+        try:
+            json.dumps(v)
+            safe[k] = v
+        except (TypeError, ValueError):
+            pass
+    return safe
+
+
+# ------------------------------------------------------------------------------
+# Background Writer
+# ------------------------------------------------------------------------------
+class _CheckpointWriter:
+    """
+    Single daemon thread that persists snapshots off the execution thread.
+    Pending requests are coalesced per checkpoint name (only the newest is written).
+    """
+    def __init__(self):
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, name, snapshot):
+        with self._cond:
+            self._pending[name] = snapshot
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="h4_checkpoint_writer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                name, snapshot = self._pending.popitem()
+            try:
+                write_checkpoint(name, snapshot)
+            except Exception as e:
+                _log("❌ CHECKPOINT WRITE FAILED | '%s' | %s", name, e)
+
+
+_WRITER = _CheckpointWriter()
+
+
+def capture_snapshot():
+    """Captures counters, orbit keys and buffer payloads (by reference) right now."""
+    state = snapshot_all()
+    return {
+        "created": time.time(),
+        "states": state["states"],
+        "orbits": {ns: _json_safe(ob) for ns, ob in state["orbits"].items()},
+        "buffer": export_buffer(),
+    }
+
+
+def write_checkpoint(name, snapshot):
+    """Writes a captured snapshot to <root>/<name>/ (tensors first, then the JSON manifest)."""
+    folder = _checkpoint_folder(name)
+    os.makedirs(folder, exist_ok=True)
+
+    # One odd payload (e.g. a MODEL) must not sink the rest of the buffer.
+    payloads = {}
+    residency = {}
+    for slot, (payload, mode) in snapshot["buffer"].items():
+        if payload is None:
+            continue
+        if not is_spillable(payload):
+            _log("⚠️ CHECKPOINT SKIPPED SLOT | '%s' | %s cannot be saved", slot, type(payload).__name__)
+            continue
+        payloads[slot] = payload
+        residency[slot] = mode
+
+    save_payload(os.path.join(folder, BUFFER_FILE), payloads)
+    saved_slots = list(payloads.keys())
+
+    manifest = {
+        "created": snapshot["created"],
+        "states": snapshot["states"],
+        "orbits": snapshot["orbits"],
+        "buffer_slots": {slot: residency[slot] for slot in saved_slots},
+    }
+    state_path = os.path.join(folder, STATE_FILE)
+    with open(f"{state_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{state_path}.tmp", state_path)
+
+    counts = {ns: st.get("loop_count") for ns, st in snapshot["states"].items()}
+    _log("💾 CHECKPOINT SAVED | '%s' | Counts: %s | Slots: %s -> %s", name, counts, saved_slots, folder)
+    return folder
+
+
+def request_checkpoint(name):
+    """Captures a snapshot now and hands it to the background writer."""
+    _checkpoint_folder(name)  # Reject bad names here, not later on the writer thread.
+    _WRITER.submit(_safe_name(name), capture_snapshot())
+
+
+def restore_checkpoint(name):
+    """Restores counters, orbit keys and buffer slots from <root>/<name>/. Returns the manifest."""
+    folder = _checkpoint_folder(name)
+    state_path = os.path.join(folder, STATE_FILE)
+    if not os.path.isfile(state_path):
+        raise FileNotFoundError(f"No checkpoint named '{name}' in {_checkpoint_root()}")
+
+    with open(state_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    load_snapshot(manifest)
+
+    slots = manifest.get("buffer_slots", {})
+    buffer_path = os.path.join(folder, BUFFER_FILE)
+    if slots and os.path.isfile(buffer_path):
+        payloads = load_payload(buffer_path)
+        for slot, mode in slots.items():
+            if slot in payloads:
+                # Detach from the mmap so the next save can replace the file (Windows locks mapped files).
+                owned = map_tensors(payloads[slot], lambda t, key: t.clone())
+                buffer_image(owned, slot, mode)
+
+    counts = {ns: st.get("loop_count") for ns, st in manifest.get("states", {}).items()}
+    _log("♻️ CHECKPOINT RESTORED | '%s' | Counts: %s | Slots: %s", name, counts, list(slots.keys()))
+    return manifest
+
+
+def list_checkpoints():
+    root = _checkpoint_root()
+    found = []
+    for entry in sorted(os.listdir(root)):
+        state_path = os.path.join(root, entry, STATE_FILE)
+        if os.path.isfile(state_path):
+            found.append({"name": entry, "modified": os.path.getmtime(state_path)})
+    return found
+
+
+# ------------------------------------------------------------------------------
+# Web API Endpoints
+# ------------------------------------------------------------------------------
+@PromptServer.instance.routes.get("/h4/checkpoint/list")
+async def h4_checkpoint_list(request):
+    return web.json_response({"root": _checkpoint_root(), "checkpoints": list_checkpoints()})
+
+
+@PromptServer.instance.routes.post("/h4/checkpoint/save")
+async def h4_checkpoint_save(request):
+    body = await request.json()
+    name = body.get("name", "h4_loop")
+    try:
+        request_checkpoint(name)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    return web.json_response({"queued": _safe_name(name)})
+
+
+@PromptServer.instance.routes.post("/h4/checkpoint/restore")
+async def h4_checkpoint_restore(request):
+    body = await request.json()
+    name = body.get("name", "h4_loop")
+    try:
+        manifest = restore_checkpoint(name)
+    except FileNotFoundError as e:
+        return web.json_response({"error": str(e)}, status=404)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    return web.json_response({"restored": _safe_name(name), "states": manifest.get("states", {})})
+
+
+# ------------------------------------------------------------------------------
+# Node
+# ------------------------------------------------------------------------------
+class H4_LoopCheckpoint:
+    """
+    💾 H4 Loop Checkpoint (Crash Safe)
+    Periodically snapshots loop counters, orbit keys and the Universal Buffer
+    to disk, and restores them after a crash.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "pulse": (ANY_TYPE, {"tooltip": "Connect any output. Passed through untouched."}),
+                "action": (["Auto-Save", "Restore", "Off"], {
+                    "default": "Auto-Save",
+                    "tooltip": "Auto-Save: Snapshot every N runs (background thread). Restore: Load the checkpoint now (switch back to Auto-Save afterwards!)."
+                }),
+                "checkpoint_name": ("STRING", {
+                    "default": "h4_loop",
+                    "multiline": False,
+                    "tooltip": "Folder name under output/h4_checkpoints (or H4_CHECKPOINT_DIR)."
+                }),
+                "every_n_runs": ("INT", {
+                    "default": 10, "min": 1, "max": 100000,
+                    "tooltip": "Save when the loop count is a multiple of this."
+                }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+            }
+        }
+
+    RETURN_TYPES = (ANY_TYPE, "STRING")
+    RETURN_NAMES = ("pass_through", "checkpoint_status")
+    FUNCTION = "process_checkpoint"
+    CATEGORY = "h4_Live/Logic"
+    OUTPUT_NODE = True
+
+    DESCRIPTION = """
+    💾 **H4 Loop Checkpoint (Crash Safe)**
+
+    Saves loop counters, wireless flags and buffered images/latents to disk
+    every N runs, without slowing the loop down (background writer).
+
+    **After a crash:** Set action to `Restore`, queue once, then set it back to `Auto-Save`.
+    Wire `pass_through` into your Router so the restore happens first.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return float("nan")
+
+    def process_checkpoint(self, pulse, action, checkpoint_name, every_n_runs, loop_name=None):
+        node_id = "LoopCheckpoint"
+
+        if action == "Restore":
+            try:
+                manifest = restore_checkpoint(checkpoint_name)
+            except (FileNotFoundError, ValueError) as e:
+                _log("[%s] ❌ %s", node_id, e)
+                raise ValueError(f"[{node_id}] {e}")
+            count = manifest.get("states", {}).get(resolve_loop_name(loop_name), {}).get("loop_count", "?")
+            return (pulse, f"♻️ RESTORED '{checkpoint_name}' | Run: {count}")
+
+        if action == "Off":
+            return (pulse, "Idle...")
+
+        count = get_state_snapshot(loop_name)["loop_count"]
+        if count > 0 and count % max(1, every_n_runs) == 0:
+            request_checkpoint(checkpoint_name)
+            return (pulse, f"💾 SAVING '{checkpoint_name}' | Run: {count}")
+        return (pulse, f"Next save in {every_n_runs - (count % max(1, every_n_runs))} run(s)")
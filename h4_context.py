@@ -2,13 +2,144 @@ import torch
 
 # H4 IMPORTS
 from .h4_utils import ANY_TYPE
+from .h4_logging import h4_log, is_enabled, DEBUG, ERROR
+from .h4_pipe import H4Pipe, PipeThunk
+from server import PromptServer
+
+# Field order = Unpack output order = Hub output order (after h4_pipe).
+PIPE_KEYS = ("model", "vae", "clip", "positive", "negative", "latent", "image", "mask", "any_A", "any_B")
+
+# Nodes that take an h4_pipe and hand the same fields on (output 0), reading none themselves.
+PIPE_PASSTHROUGH = {"H4_PipeResidency", "H4_PipeLoad"}
+
+
+def _is_link(value):
+    return isinstance(value, (list, tuple)) and len(value) == 2 and isinstance(value[1], int)
+
+
+def _link_index(dynprompt):
+    """source node id -> [(consumer id, input name, output slot)] for the whole prompt."""
+    index = {}
+    for nid in dynprompt.all_node_ids():
+        node = dynprompt.get_node(nid)
+        for name, value in node.get("inputs", {}).items():
+            if _is_link(value):
+                index.setdefault(value[0], []).append((nid, name, value[1]))
+    return index
+
+
+def _linked_keys(index, node_id, offset):
+    """Pipe keys whose output slot (key index + offset) is connected."""
+    return {PIPE_KEYS[s - offset] for _, _, s in index.get(node_id, []) if 0 <= s - offset < len(PIPE_KEYS)}
+
+
+def _hub_demand(dynprompt, index, hub_id, seen):
+    """
+    Pipe keys something downstream of this hub actually reads. A non-h4 node
+    reading the pipe (output 0) may read any key, so it counts as all of them;
+    the per-field outputs always stay exact.
+    """
+    seen.add(hub_id)
+    passthrough = dynprompt.get_node(hub_id).get("class_type") in PIPE_PASSTHROUGH
+    needed = set()
+    for consumer, input_name, slot in index.get(hub_id, []):
+        if slot > 0:
+            if not passthrough:
+                needed.add(PIPE_KEYS[slot - 1])
+            continue
+        class_type = dynprompt.get_node(consumer).get("class_type")
+        if class_type == "H4_ContextUnpack":
+            needed.update(_linked_keys(index, consumer, 0))
+        elif (class_type == "H4_ContextHub" and input_name == "base_pipe") or class_type in PIPE_PASSTHROUGH:
+            if consumer in seen:
+                continue
+            downstream = _hub_demand(dynprompt, index, consumer, seen)
+            # Keys the next hub overrides never reach its readers from here.
+            overridden = set(dynprompt.get_node(consumer).get("inputs", {}))
+            needed.update(downstream - overridden)
+        else:
+            needed.update(PIPE_KEYS)
+    return needed
+
+
+class _PromptView:
+    """Gives a plain API prompt dict the two DynamicPrompt calls the demand scan uses."""
+    def __init__(self, prompt):
+        self.prompt = prompt
+
+    def all_node_ids(self):
+        return list(self.prompt.keys())
+
+    def get_node(self, node_id):
+        return self.prompt.get(node_id, {})
+
+
+# Extra prompt input carrying a node's demanded keys. Not declared in INPUT_TYPES
+# (no widget, never passed on), but ComfyUI's cache key covers every prompt input,
+# so wiring up a new downstream output re-runs the hub / unpack instead of
+# reusing a result that skipped that field.
+DEMAND_INPUT = "h4_demand"
+
+
+def tag_pipe_demand(prompt):
+    """
+    Writes DEMAND_INPUT into every Context Hub / Unpack of an API prompt.
+    Hub:    "<keys to compute>|<keys on its own connected outputs>"
+    Unpack: "<keys on its connected outputs>"
+    """
+    view = _PromptView(prompt)
+    index = _link_index(view)
+    for nid, node in prompt.items():
+        class_type = node.get("class_type")
+        if class_type == "H4_ContextHub":
+            demand = _hub_demand(view, index, nid, set())
+            tag = ",".join(sorted(demand)) + "|" + ",".join(sorted(_linked_keys(index, nid, 1)))
+        elif class_type == "H4_ContextUnpack":
+            tag = ",".join(sorted(_linked_keys(index, nid, 0)))
+        else:
+            continue
+        node.setdefault("inputs", {})[DEMAND_INPUT] = tag
+
+
+def _on_prompt(json_data):
+    prompt = json_data.get("prompt")
+    if isinstance(prompt, dict):
+        try:
+            tag_pipe_demand(prompt)
+        except Exception as e:
+            h4_log("ContextHub", "⚠️ Demand tagging failed: %s", e, level=ERROR)
+    return json_data
+
+
+PromptServer.instance.add_on_prompt_handler(_on_prompt)
+
+
+def _tagged_demand(dynprompt, unique_id):
+    """
+    Key sets recorded by tag_pipe_demand ("|"-separated parts), or None if the
+    prompt was not tagged (= compute and read everything). Using the tag, not a
+    fresh scan, keeps what the node skips identical to what its cache key says.
+    """
+    if dynprompt is None or unique_id is None:
+        return None
+    tag = dynprompt.get_node(unique_id).get("inputs", {}).get(DEMAND_INPUT)
+    if not isinstance(tag, str):
+        return None
+    return [{k for k in part.split(",") if k} for part in tag.split("|")]
+
+
+def _not_computed(key):
+    def fail():
+        raise ValueError(f"[ContextHub] Pipe field '{key}' was skipped (no connected output needed it) and cannot be read.")
+    return fail
 
 class H4_ContextHub:
     """
     The 'Mothership' node.
     1. Accepts optional inputs for all major ComfyUI types.
     2. Logs detailed debug info to the console.
-    3. Bundles inputs into a single 'h4_pipe' dictionary.
+    3. Bundles inputs into a single 'h4_pipe' (immutable H4Pipe, shares
+       unchanged keys with base_pipe instead of copying them).
     """
     def __init__(self):
         pass
@@ -19,16 +150,21 @@ class H4_ContextHub:
             "required": {},
             "optional": {
                 "base_pipe": ("H4_PIPE",),
-                "model": ("MODEL",),
-                "vae": ("VAE",),
-                "clip": ("CLIP",),
-                "positive": ("CONDITIONING",),
-                "negative": ("CONDITIONING",),
-                "latent": ("LATENT",),
-                "image": ("IMAGE",),
-                "mask": ("MASK",),
-                "any_A": (ANY_TYPE,),
-                "any_B": (ANY_TYPE,),
+                # Lazy: only evaluated if a connected output (or a downstream Unpack) reads the field.
+                "model": ("MODEL", {"lazy": True}),
+                "vae": ("VAE", {"lazy": True}),
+                "clip": ("CLIP", {"lazy": True}),
+                "positive": ("CONDITIONING", {"lazy": True}),
+                "negative": ("CONDITIONING", {"lazy": True}),
+                "latent": ("LATENT", {"lazy": True}),
+                "image": ("IMAGE", {"lazy": True}),
+                "mask": ("MASK", {"lazy": True}),
+                "any_A": (ANY_TYPE, {"lazy": True}),
+                "any_B": (ANY_TYPE, {"lazy": True}),
+            },
+            "hidden": {
+                "dynprompt": "DYNPROMPT",
+                "unique_id": "UNIQUE_ID",
             }
         }
 
@@ -38,66 +174,74 @@ class H4_ContextHub:
     CATEGORY = "h4_Live"
 
     def log_input(self, name, value):
-        if value is None:
-            # print(f"   ⚠️ [{name.upper()}] is MISSING/None") 
+        # Per-input reports are DEBUG only: describing tensors is not free.
+        if value is None or not is_enabled(DEBUG):
             return
-            
-        print(f"   🔹 [{name.upper()}] detected:", end=" ")
         
         try:
             # Tensor / Image / Mask
             if torch.is_tensor(value):
-                print(f"Tensor Shape: {list(value.shape)} | Device: {value.device} | Dtype: {value.dtype}")
+                detail = f"Tensor Shape: {list(value.shape)} | Device: {value.device} | Dtype: {value.dtype}"
             
             # Latent Dictionary
             elif isinstance(value, dict) and "samples" in value:
-                print(f"Latent Shape: {list(value['samples'].shape)}")
+                detail = f"Latent Shape: {list(value['samples'].shape)}"
                 
             # Standard Classes
             elif hasattr(value, '__class__'):
-                class_name = value.__class__.__name__
-                print(f"Class: {class_name}")
+                detail = f"Class: {value.__class__.__name__}"
                 
             # Lists (Batches often come as lists)
             elif isinstance(value, list):
-                print(f"List (Length: {len(value)})")
+                detail = f"List (Length: {len(value)})"
                 
             # Primitives
             else:
-                print(f"Value: {value}")
+                detail = f"Value: {value}"
         except Exception as e:
-            print(f"Error inspecting {name}: {e}")
+            detail = f"Error inspecting {name}: {e}"
+        
+        h4_log("ContextHub", "   🔹 [%s] detected: %s", name.upper(), detail, level=DEBUG)
 
-    def process_hub(self, base_pipe=None, model=None, vae=None, clip=None, positive=None, negative=None, latent=None, image=None, mask=None, any_A=None, any_B=None):
-        print("\n[h4_Live] 📡 Context Hub Report")
-        print("-------------------------------------------------")
+    def check_lazy_status(self, dynprompt=None, unique_id=None, **kwargs):
+        tag = _tagged_demand(dynprompt, unique_id)
+        demand = tag[0] if tag else None
+        # Connected-but-unevaluated lazy inputs arrive as None.
+        return [k for k in PIPE_KEYS if k in kwargs and kwargs[k] is None and (demand is None or k in demand)]
+
+    def process_hub(self, base_pipe=None, dynprompt=None, unique_id=None, **kwargs):
+        h4_log("ContextHub", "📡 Context Hub Report", level=DEBUG)
+        tag = _tagged_demand(dynprompt, unique_id)
+        demand = tag[0] if tag else None
+        # Only the hub's own connected outputs force a lazy pipe field (e.g. from
+        # H4_PipeLoad); fields only read further down stay lazy inside the pipe.
+        outputs = tag[1] if tag and len(tag) > 1 else None
         
         try:
-            # 1. Initialize Pipe (Start fresh or extend existing)
+            # 1. Initialize Pipe (Start fresh or extend existing; legacy dicts are wrapped)
+            base = H4Pipe.from_mapping(base_pipe)
             if base_pipe:
-                new_pipe = base_pipe.copy()
-                print(f"   🔄 Extending Base Pipe (Keys: {len(base_pipe)})")
-            else:
-                new_pipe = {}
-
-            # 2. Update Pipe & Log
-            inputs = {
-                "model": model, "vae": vae, "clip": clip, 
-                "positive": positive, "negative": negative, 
-                "latent": latent, "image": image, "mask": mask,
-                "any_A": any_A, "any_B": any_B
-            }
+                h4_log("ContextHub", "   🔄 Extending Base Pipe (Keys: %s)", len(base), level=DEBUG)
 
-            for key, val in inputs.items():
-                if val is not None:
-                    new_pipe[key] = val
-                    self.log_input(key, val)
-
-            print("-------------------------------------------------\n")
+            # 2. Update Pipe & Log (only the keys that were given are stored in the new layer)
+            changes = {key: kwargs[key] for key in PIPE_KEYS if kwargs.get(key) is not None}
+            for key, val in changes.items():
+                self.log_input(key, val)
+            # Connected but never requested: nobody downstream reads it. Keep a deferred
+            # marker so the old base value can't leak through under this key.
+            skipped = [k for k in PIPE_KEYS if k in kwargs and kwargs[k] is None and demand is not None and k not in demand]
+            for key in skipped:
+                changes[key] = PipeThunk(_not_computed(key))
+            if skipped:
+                h4_log("ContextHub", "   💤 Not computed (unused downstream): %s", ", ".join(skipped), level=DEBUG)
+            new_pipe = base.extend(changes)
 
             # 3. Return Passthrough (Use value from pipe if exists, or current input)
             def get_val(k):
-                return new_pipe.get(k, None)
+                # Unread outputs never force a lazy field.
+                if outputs is None or k in outputs:
+                    return new_pipe.get(k, None)
+                return new_pipe.peek(k)
 
             return (
                 new_pipe,
@@ -108,14 +252,14 @@ class H4_ContextHub:
             )
             
         except Exception as e:
-            print(f"❌ [H4_ContextHub] CRITICAL ERROR: {e}")
+            h4_log("H4_ContextHub", "❌ CRITICAL ERROR: %s", e, level=ERROR)
             # Fail gracefully (?) or re-raise
-            return ({}, None, None, None, None, None, None, None, None, None, None)
+            return (H4Pipe(), None, None, None, None, None, None, None, None, None, None)
 
 class H4_ContextUnpack:
     """
     The Distributor node.
-    Unpacks the 'h4_pipe' dictionary back into individual connections.
+    Unpacks the 'h4_pipe' (H4Pipe or legacy dict) back into individual connections.
     """
     def __init__(self):
         pass
@@ -125,6 +269,10 @@ class H4_ContextUnpack:
         return {
             "required": {
                 "h4_pipe": ("H4_PIPE",),
+            },
+            "hidden": {
+                "dynprompt": "DYNPROMPT",
+                "unique_id": "UNIQUE_ID",
             }
         }
 
@@ -133,21 +281,16 @@ class H4_ContextUnpack:
     FUNCTION = "unpack_pipe"
     CATEGORY = "h4_Live"
     
-    def unpack_pipe(self, h4_pipe):
-        try:
-            def get_val(k):
-                val = h4_pipe.get(k, None)
-                if val is None:
-                    # Optional: Print warning to console if critical types are missing?
-                    pass
-                return val
-                
-            return (
-                get_val("model"), get_val("vae"), get_val("clip"),
-                get_val("positive"), get_val("negative"),
-                get_val("latent"), get_val("image"), get_val("mask"),
-                get_val("any_A"), get_val("any_B")
-            )
-        except Exception as e:
-            print(f"❌ [H4_ContextUnpack] CRITICAL ERROR: {e}")
-            return (None,)*10
+    def unpack_pipe(self, h4_pipe, dynprompt=None, unique_id=None, **kwargs):
+        # Only connected outputs materialize lazy pipe fields.
+        tag = _tagged_demand(dynprompt, unique_id) if isinstance(h4_pipe, H4Pipe) else None
+        linked = tag[0] if tag else None
+
+        def get_val(k):
+            # Each field on its own: a field that fails to load raises its own error
+            # instead of blanking every output.
+            if linked is None or k in linked:
+                return h4_pipe.get(k, None)
+            return h4_pipe.peek(k)
+
+        return tuple(get_val(k) for k in PIPE_KEYS)
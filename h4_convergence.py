@@ -0,0 +1,168 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_convergence.py
+# ------------------------------------------------------------------------------
+# H4 Convergence Monitor (Early Stop)
+# Rule 1 (No Placeholders): Real delta metrics on a small proxy.
+# Rule 11 (Logging): Every iteration logs its delta and streak.
+# Rule 20 (Clairvoyant Development): The comparison runs on a pooled
+# proxy (default 64px), so it costs next to nothing next to a sampler step.
+# When the loop stops changing, it raises a wireless stop / reset flag.
+# ------------------------------------------------------------------------------
+import threading
+
+import torch
+import torch.nn.functional as F
+
+from .h4_core import _log, orbit_set, resolve_loop_name, on_loop_reset
+from .h4_utils import ANY_TYPE, LOOP_NAME_INPUT
+
+METRICS = ["L1 (Proxy)", "1 - SSIM (Proxy)", "Relative Norm"]
+ACTIONS = ["Request Stop", "Request Reset", "Report Only"]
+
+# Previous proxy + streak per loop namespace.
+_MONITORS = {}
+_MONITORS_LOCK = threading.Lock()
+
+
+def _to_nchw(payload):
+    """IMAGE [B,H,W,C] or LATENT {"samples": [B,C,H,W(,..)]} -> float [N,C,H,W]."""
+    if isinstance(payload, dict) and torch.is_tensor(payload.get("samples")):
+        x = payload["samples"]
+        if x.dim() == 5:
+            # Video latents [B,C,T,H,W]: compare every frame.
+            x = x.movedim(2, 1).reshape(-1, x.shape[1], x.shape[-2], x.shape[-1])
+        return x.detach().float()
+    if torch.is_tensor(payload) and payload.dim() == 4:
+        return payload.detach().float().movedim(-1, 1)
+    raise ValueError(f"Expected IMAGE or LATENT, got {type(payload).__name__}.")
+
+
+def make_proxy(payload, size):
+    x = _to_nchw(payload)
+    if max(x.shape[-2:]) > size:
+        x = F.adaptive_avg_pool2d(x, (min(size, x.shape[-2]), min(size, x.shape[-1])))
+    return x
+
+
+def _ssim(a, b):
+    """Mean SSIM with a 7x7 box window (range taken from the previous proxy)."""
+    data_range = float((b.max() - b.min()).clamp_min(1e-6))
+    c1, c2 = (0.01 * data_range) ** 2, (0.03 * data_range) ** 2
+    k = min(7, a.shape[-2], a.shape[-1])
+    mu_a, mu_b = F.avg_pool2d(a, k, 1), F.avg_pool2d(b, k, 1)
+    var_a = F.avg_pool2d(a * a, k, 1) - mu_a ** 2
+    var_b = F.avg_pool2d(b * b, k, 1) - mu_b ** 2
+    cov = F.avg_pool2d(a * b, k, 1) - mu_a * mu_b
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+
+def proxy_delta(current, previous, metric):
+    """Lower = more similar. All metrics are 0 for identical inputs."""
+    if metric == "1 - SSIM (Proxy)":
+        return 1.0 - _ssim(current, previous)
+    if metric == "Relative Norm":
+        return float(torch.linalg.vector_norm(current - previous) / torch.linalg.vector_norm(previous).clamp_min(1e-8))
+    return float((current - previous).abs().mean())
+
+
+def reset_monitor(loop_name=None):
+    with _MONITORS_LOCK:
+        _MONITORS.pop(resolve_loop_name(loop_name), None)
+
+
+# A reset loop starts over: its first frame must not be compared with the old run's last one.
+on_loop_reset(reset_monitor)
+
+
+class H4_ConvergenceMonitor:
+    """
+    📉 H4 Convergence Monitor (Early Stop)
+    Compares each loop output with the previous one on a tiny proxy and
+    signals Stop / Reset once it has settled for k runs in a row.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "current": (ANY_TYPE, {"tooltip": "This run's IMAGE or LATENT. Passed through untouched."}),
+                "metric": (METRICS, {
+                    "default": "L1 (Proxy)",
+                    "tooltip": "L1: mean pixel change. 1 - SSIM: structural change. Relative Norm: best for latents."
+                }),
+                "threshold": ("FLOAT", {
+                    "default": 0.005, "min": 0.0, "max": 10.0, "step": 0.0001,
+                    "tooltip": "Below this = 'not changing anymore'."
+                }),
+                "patience": ("INT", {
+                    "default": 3, "min": 1, "max": 1000,
+                    "tooltip": "How many runs in a row must be below threshold (k)."
+                }),
+                "proxy_size": ("INT", {
+                    "default": 64, "min": 8, "max": 1024, "step": 8,
+                    "tooltip": "Compare on a downsampled copy this big (longest side). Smaller = cheaper."
+                }),
+                "action": (ACTIONS, {
+                    "default": "Request Stop",
+                    "tooltip": "Request Stop: H4 Loop End finishes early. Request Reset: Same as the Wireless Reset button. Report Only: Just outputs."
+                }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+            }
+        }
+
+    RETURN_TYPES = (ANY_TYPE, "FLOAT", "BOOLEAN", "STRING")
+    RETURN_NAMES = ("pass_through", "delta", "converged", "status")
+    FUNCTION = "monitor"
+    CATEGORY = "h4_Live/Logic"
+    OUTPUT_NODE = True
+
+    DESCRIPTION = """
+    📉 **H4 Convergence Monitor (Early Stop)**
+
+    Stops wasting GPU time once the image has stopped changing.
+
+    **Usage:** Put me right after the sampler (or decoder) inside the loop.
+    With `H4 Loop End`, wire `pass_through` into its `value` so I run first.
+    With queue-based loops, use `Request Reset` (picked up by Mission Control /
+    Loop Incrementer with wireless reset ON).
+    """
+
+    # Keeps its own memory (previous proxy + streak), so it must see every run.
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return float("nan")
+
+    def monitor(self, current, metric, threshold, patience, proxy_size, action, loop_name=None):
+        node_id = "ConvergenceMonitor"
+        ns = resolve_loop_name(loop_name)
+        proxy = make_proxy(current, proxy_size)
+
+        with _MONITORS_LOCK:
+            record = _MONITORS.get(ns)
+            if record is None or record["proxy"].shape != proxy.shape or record["proxy"].device != proxy.device:
+                _MONITORS[ns] = {"proxy": proxy, "streak": 0}
+                _log("[%s] 📉 Baseline stored | Loop: %s | Proxy: %s", node_id, ns, list(proxy.shape))
+                return (current, -1.0, False, "Baseline stored (first run or size changed).")
+
+            delta = proxy_delta(proxy, record["proxy"], metric)
+            record["proxy"] = proxy
+            record["streak"] = record["streak"] + 1 if delta < threshold else 0
+            streak = record["streak"]
+
+        converged = streak >= patience
+        _log("[%s] Δ %.6f (%s) | Streak: %s/%s", node_id, delta, metric, streak, patience)
+
+        if not converged:
+            return (current, delta, False, f"Δ {delta:.6f} | Streak {streak}/{patience}")
+
+        if action == "Request Stop":
+            orbit_set("request_stop", True, loop_name)
+        elif action == "Request Reset":
+            orbit_set("request_reset", True, loop_name)
+        if action != "Report Only":
+            # Fresh start for the next loop; the signal is one-shot.
+            reset_monitor(loop_name)
+        _log("[%s] ✅ CONVERGED | Loop: %s | Δ %.6f < %s for %s runs | %s", node_id, ns, delta, threshold, streak, action)
+        return (current, delta, True, f"✅ CONVERGED (Δ {delta:.6f}) -> {action}")
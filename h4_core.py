@@ -2,80 +2,678 @@
 # ------------------------------------------------------------------------------
 # Core State Manager
 # Rule 8 (Security): No external IO, memory only.
+#   (Exception: the Universal Buffer may spill oversized payloads to a local temp dir.)
 # Rule 11 (Logging): Contextual print statements for debugging.
 # Rule 21 (Debug Review): Nuclear logging implemented.
 # ------------------------------------------------------------------------------
+import json
+import os
 import time
-import datetime
+import uuid
+import threading
+from collections import OrderedDict
+
+from .h4_logging import h4_log, is_enabled, INFO, WARNING, ERROR
+from .h4_tensor_io import save_payload, load_payload, UnspillablePayload, pack_payload, unpack_payload, map_tensors, RESIDENCY_MODES
+from .h4_shared import SharedSegment, shared_group_name, shared_buffer_enabled, new_buffer_path
+
+# Namespace used when a node does not name its loop (legacy single-loop behaviour).
+DEFAULT_LOOP_NAME = "default"
+
+def _new_state():
+    return {
+        "loop_count": 0,
+        "last_run_time": 0.0,
+        "active": True
+    }
 
 # The "Holy Grail" - This variable lives as long as ComfyUI runs.
-_H4_GLOBAL_STATE = {
-    "loop_count": 0,
-    "last_run_time": 0.0,
-    "active": True
-}
+# Kept as the 'default' namespace so legacy imports keep working.
+_H4_GLOBAL_STATE = _new_state()
 
 # ORBIT STORAGE (Wireless Feedback)
 _H4_ORBIT_STORAGE = {}
 
+# STATE REGISTRY (One counter + orbit per loop name)
+_H4_STATE_REGISTRY = {DEFAULT_LOOP_NAME: _H4_GLOBAL_STATE}
+_H4_ORBIT_REGISTRY = {DEFAULT_LOOP_NAME: _H4_ORBIT_STORAGE}
+
+# CROSS-PROCESS BACKEND (Optional, see h4_shared.py)
+# When enabled, the registries above are a local mirror of a shared-memory segment:
+# pulled on the outermost state-lock entry, pushed back on exit if anything changed.
+# Shared buffer records ({slot: {"gen", "path"}}) ride along in _H4_SHARED_META.
+_SHARED = None
+_SHARED_SEEN = {"version": -1, "text": None}
+_H4_SHARED_META = {"buffer_generation": 0, "buffers": {}}
+
+def _json_safe_items(mapping):
+    safe = {}
+    for k, v in mapping.items():
+        try:
+            json.dumps(v)
+            safe[k] = v
+        except (TypeError, ValueError):
+            pass  # Models / tensors stay process-local.
+    return safe
+
+def _shared_serialize():
+    return json.dumps({
+        "states": _H4_STATE_REGISTRY,
+        "orbits": {ns: _json_safe_items(ob) for ns, ob in _H4_ORBIT_REGISTRY.items()},
+        "meta": _H4_SHARED_META,
+    }, sort_keys=True)
+
+def _shared_pull():
+    version, data = _SHARED.read()
+    if version == _SHARED_SEEN["version"] or not data:
+        return
+    snapshot = json.loads(data)
+    for ns, st in snapshot.get("states", {}).items():
+        _H4_STATE_REGISTRY.setdefault(ns, _new_state()).update(st)
+    for ns, ob in snapshot.get("orbits", {}).items():
+        orbit = _H4_ORBIT_REGISTRY.setdefault(ns, {})
+        for key in [k for k in _json_safe_items(orbit) if k not in ob]:
+            del orbit[key]  # Removed by another worker.
+        orbit.update(ob)
+    _H4_SHARED_META.update(snapshot.get("meta", {}))
+    # Compare pushes against what the segment holds, so local-only loops get published.
+    _SHARED_SEEN.update(version=version, text=data.decode("utf-8"))
+
+def _shared_push():
+    text = _shared_serialize()
+    if text == _SHARED_SEEN["text"]:
+        return
+    try:
+        version = _SHARED.write(text.encode("utf-8"))
+    except ValueError as e:
+        _log("❌ SHARED STATE WRITE FAILED | %s", e, level=ERROR)
+        return
+    _SHARED_SEEN.update(version=version, text=text)
+
+class _StateLock:
+    """
+    Re-entrant state lock. With the shared backend on, the outermost holder
+    also holds the inter-process lock and syncs the registries in / out.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._segment = None  # Segment whose lock the outermost holder took.
+
+    def __enter__(self):
+        self._lock.acquire()
+        self._depth += 1
+        if self._depth == 1 and _SHARED is not None:
+            segment = _SHARED
+            segment.lock.acquire()
+            try:
+                _shared_pull()
+            except Exception:
+                segment.lock.release()
+                self._depth -= 1
+                self._lock.release()
+                raise
+            self._segment = segment
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self._depth == 1 and self._segment is not None:
+                segment, self._segment = self._segment, None
+                try:
+                    _shared_push()
+                finally:
+                    segment.lock.release()
+        finally:
+            self._depth -= 1
+            self._lock.release()
+        return False
+
+# LOCKS (Prompt workers + aiohttp routes touch the same dicts)
+# Re-entrant so helpers can call each other while holding the lock.
+_H4_STATE_LOCK = _StateLock()
+_H4_BUFFER_LOCK = threading.RLock()
+
 # IMAGE BUFFER (RAM Storage for Zero-Lag Loops)
-_H4_IMAGE_BUFFER = None
+# Named slots, most-recently-used last. Each entry:
+#   {"payload", "bytes", "source_bytes", "residency", "plan",
+#    "stored_at", "last_access", "generation", "spill_path", "disk_bytes"}
+# A spilled entry has payload=None / bytes=0 and lives in spill_path instead.
+# 'plan' records the original dtypes when a compact residency was applied.
+DEFAULT_BUFFER_SLOT = "default"
+_H4_BUFFER_SLOTS = OrderedDict()
 
-def buffer_image(data_payload):
-    """Stores any data (Image/Latent/Text) in RAM."""
-    global _H4_IMAGE_BUFFER
-    _H4_IMAGE_BUFFER = data_payload
+# Memory ceiling (0 = unlimited) and idle TTL (0 = never expire).
+# Override at startup with H4_BUFFER_MAX_MB / H4_BUFFER_TTL_S, or via configure_buffer().
+_H4_BUFFER_CONFIG = {
+    "max_bytes": int(float(os.environ.get("H4_BUFFER_MAX_MB", "0")) * 1024 * 1024),
+    "ttl_seconds": float(os.environ.get("H4_BUFFER_TTL_S", "0")),
+    # Opt-in: over-budget payloads go to disk as safetensors instead of being dropped
+    # (a synchronous write, and GPU payloads come back as memory-mapped CPU tensors).
+    "spill": os.environ.get("H4_BUFFER_SPILL", "0") not in ("0", "false", "False", ""),
+    "spill_dir": os.environ.get("H4_BUFFER_SPILL_DIR", ""),
+}
+
+# Bumped on every write so readers can tell a fresh payload from a stale one.
+_H4_BUFFER_GENERATION = 0
+
+def payload_nbytes(obj, _depth=0):
+    """
+    Best-effort byte footprint of a buffered payload.
+    Counts tensor / ndarray storage and walks latent dicts, lists and tuples.
+    Anything else (models, strings, ints) is counted as 0.
+    """
+    if obj is None or _depth > 8:
+        return 0
+    if hasattr(obj, "element_size") and hasattr(obj, "nelement"):
+        try:
+            return int(obj.element_size() * obj.nelement())
+        except Exception:
+            return 0
+    if hasattr(obj, "nbytes") and isinstance(getattr(obj, "nbytes"), int):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sum(payload_nbytes(v, _depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(payload_nbytes(v, _depth + 1) for v in obj)
+    return 0
+
+def resolve_slot_name(slot_name=None):
+    """Normalises a buffer slot name. Empty / missing names use the 'default' slot."""
+    if slot_name is None:
+        return DEFAULT_BUFFER_SLOT
+    name = str(slot_name).strip()
+    return name if name else DEFAULT_BUFFER_SLOT
+
+def configure_buffer(max_bytes=None, ttl_seconds=None, spill=None):
+    """Updates the buffer memory ceiling / TTL / disk spill and enforces them immediately."""
+    with _H4_BUFFER_LOCK:
+        if max_bytes is not None:
+            _H4_BUFFER_CONFIG["max_bytes"] = max(0, int(max_bytes))
+        if ttl_seconds is not None:
+            _H4_BUFFER_CONFIG["ttl_seconds"] = max(0.0, float(ttl_seconds))
+        if spill is not None:
+            _H4_BUFFER_CONFIG["spill"] = bool(spill)
+        _log("📦 BUFFER CONFIG | Max: %.1f MB | TTL: %ss | Spill: %s", _H4_BUFFER_CONFIG['max_bytes'] / 1048576, _H4_BUFFER_CONFIG['ttl_seconds'], _H4_BUFFER_CONFIG['spill'])
+        _expire_slots()
+        _evict_slots()
+        return dict(_H4_BUFFER_CONFIG)
+
+def _buffer_total_bytes():
+    return sum(entry["bytes"] for entry in _H4_BUFFER_SLOTS.values())
+
+def _spill_dir():
+    path = _H4_BUFFER_CONFIG["spill_dir"]
+    if not path:
+        try:
+            import folder_paths
+            base = folder_paths.get_temp_directory()
+        except Exception:
+            import tempfile
+            base = tempfile.gettempdir()
+        path = os.path.join(base, "h4_buffer_spill")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _remove_spill_file(entry):
+    path = entry.get("spill_path")
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _drop_slot(slot):
+    entry = _H4_BUFFER_SLOTS.pop(slot, None)
+    if entry is not None:
+        _remove_spill_file(entry)
+    return entry
+
+def _spill_slot(slot):
+    """Moves a RAM slot to disk. Returns False if the payload cannot be spilled."""
+    entry = _H4_BUFFER_SLOTS[slot]
+    if not _H4_BUFFER_CONFIG["spill"] or entry.get("spill_path") or entry["bytes"] == 0:
+        return False
+    path = os.path.join(_spill_dir(), f"{uuid.uuid4().hex}.safetensors")
+    try:
+        disk_bytes = save_payload(path, entry["payload"], metadata={"slot": slot})
+    except UnspillablePayload as e:
+        _log("⚠️ BUFFER SPILL SKIPPED | Slot: '%s' | %s", slot, e)
+        return False
+    except Exception as e:
+        _log("❌ BUFFER SPILL FAILED | Slot: '%s' | %s", slot, e)
+        return False
+    devices = set()
+    map_tensors(entry["payload"], lambda t, key: devices.add(t.device.type) or t)
+    if devices - {"cpu"}:
+        _log("⚠️ BUFFER SPILL | Slot: '%s' | GPU tensors will be read back as memory-mapped CPU tensors.", slot, level=WARNING)
+    freed = entry["bytes"]
+    entry.update(payload=None, bytes=0, spill_path=path, disk_bytes=disk_bytes)
+    _log("💾 BUFFER SPILLED | Slot: '%s' | Freed: %.1f MB RAM -> %s", slot, freed / 1048576, path)
+    return True
+
+def _expire_slots():
+    """Drops slots that have not been touched within the TTL."""
+    ttl = _H4_BUFFER_CONFIG["ttl_seconds"]
+    if ttl <= 0:
+        return
+    now = time.time()
+    for slot in [k for k, e in _H4_BUFFER_SLOTS.items() if now - e["last_access"] > ttl]:
+        _drop_slot(slot)
+        _log("⏳ BUFFER EXPIRED | Slot: '%s'", slot)
+
+def _evict_slots(keep=None):
+    """
+    Frees RAM until the total fits under the ceiling.
+    Least-recently-used slots are spilled to disk first (if possible), else dropped.
+    The slot being written ('keep') is spilled as a last resort, never dropped.
+    """
+    limit = _H4_BUFFER_CONFIG["max_bytes"]
+    if limit <= 0:
+        return
+    while _buffer_total_bytes() > limit:
+        victim = next((k for k, e in _H4_BUFFER_SLOTS.items() if k != keep and e["bytes"] > 0), None)
+        if victim is None:
+            if keep in _H4_BUFFER_SLOTS and _spill_slot(keep):
+                continue
+            _log("⚠️ BUFFER OVER BUDGET | Slot '%s' alone exceeds %.1f MB", keep, limit / 1048576)
+            return
+        if _spill_slot(victim):
+            continue
+        entry = _drop_slot(victim)
+        _log("🗑️ BUFFER EVICTED (LRU) | Slot: '%s' | Freed: %.1f MB", victim, entry['bytes'] / 1048576)
+
+def _sharing_buffer():
+    return _SHARED is not None and shared_buffer_enabled()
+
+def _next_generation():
+    """Local counter, or the group-wide one when the buffer is shared (newest write wins)."""
+    global _H4_BUFFER_GENERATION
+    if _sharing_buffer():
+        with _H4_STATE_LOCK:
+            _H4_SHARED_META["buffer_generation"] += 1
+            return _H4_SHARED_META["buffer_generation"]
+    _H4_BUFFER_GENERATION += 1
+    return _H4_BUFFER_GENERATION
+
+def _shared_buffer_record(slot):
+    if not _sharing_buffer():
+        return None
+    with _H4_STATE_LOCK:
+        record = _H4_SHARED_META["buffers"].get(slot)
+        return dict(record) if record else None
+
+def _publish_buffer(slot, payload, generation):
+    """Writes a payload where the other workers can memory-map it."""
+    path = new_buffer_path(_SHARED.group, slot)
+    try:
+        save_payload(path, payload, metadata={"slot": slot, "pid": str(os.getpid())})
+    except UnspillablePayload as e:
+        _log("⚠️ SHARED BUFFER SKIPPED | Slot: '%s' | %s (kept local)", slot, e)
+        return
+    except Exception as e:
+        _log("❌ SHARED BUFFER WRITE FAILED | Slot: '%s' | %s", slot, e, level=ERROR)
+        return
+    with _H4_STATE_LOCK:
+        old = _H4_SHARED_META["buffers"].get(slot)
+        if old and old["gen"] > generation:
+            stale = path  # Another worker published something newer meanwhile.
+        else:
+            _H4_SHARED_META["buffers"][slot] = {"gen": generation, "path": path}
+            stale = old["path"] if old else None
+    if stale:
+        _remove_spill_file({"spill_path": stale})
+
+def buffer_image(data_payload, slot_name=None, residency="keep"):
+    """
+    Stores any data (Image/Latent/Text) in RAM under a named slot.
+    residency: one of RESIDENCY_MODES (keep / pinned_cpu / compact_fp16 / compact_uint8).
+    """
+    with _H4_BUFFER_LOCK:
+        slot = resolve_slot_name(slot_name)
+        now = time.time()
+        generation = _next_generation()
     
-    # Safe Logging for AnyType
-    info = "Unknown Type"
-    if hasattr(data_payload, 'shape'):
-        info = f"Tensor:{list(data_payload.shape)}"
-    elif hasattr(data_payload, 'keys'):
-        info = f"DictKeys:{list(data_payload.keys())}"
-    else:
-        info = str(type(data_payload))
-        
-    _log(f"📦 UNIVERSAL BUFFER UPDATE | Info: {info}")
-
-def get_buffered_image():
-    """Retrieves the stored payload."""
-    global _H4_IMAGE_BUFFER
-    return _H4_IMAGE_BUFFER
-
-def _log(message: str):
-    """Internal helper for timestamped logging (Rule 11)."""
-    ts = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-    print(f"[h4_Live][CORE][{ts}] {message}")
-
-def get_state():
-    return _H4_GLOBAL_STATE
-
-def orbit_set(key, value):
-    _H4_ORBIT_STORAGE[key] = value
-
-def orbit_get(key):
-    return _H4_ORBIT_STORAGE.get(key, None)
-
-def increment_loop():
-    """Safely increments the loop counter with nuclear logging."""
-    global _H4_GLOBAL_STATE
+        if residency not in RESIDENCY_MODES:
+            _log("⚠️ Unknown residency '%s', using 'keep'.", residency)
+            residency = "keep"
+        source_bytes = payload_nbytes(data_payload)
+        stored, plan = pack_payload(data_payload, residency)
     
-    old_count = _H4_GLOBAL_STATE["loop_count"]
-    _H4_GLOBAL_STATE["loop_count"] += 1
-    _H4_GLOBAL_STATE["last_run_time"] = time.time()
+        _drop_slot(slot)
+        _H4_BUFFER_SLOTS[slot] = {
+            "payload": stored,
+            "bytes": payload_nbytes(stored),
+            "source_bytes": source_bytes,
+            "residency": residency,
+            "plan": plan,
+            "stored_at": now,
+            "last_access": now,
+            "generation": generation,
+            "spill_path": None,
+            "disk_bytes": 0,
+        }
     
-    new_count = _H4_GLOBAL_STATE["loop_count"]
-    _log(f"State UPDATE | Increment | {old_count} -> {new_count}")
+        # Safe Logging for AnyType (only built when INFO is on)
+        if is_enabled(INFO):
+            info = "Unknown Type"
+            if hasattr(data_payload, 'shape'):
+                info = f"Tensor:{list(data_payload.shape)}"
+            elif hasattr(data_payload, 'keys'):
+                info = f"DictKeys:{list(data_payload.keys())}"
+            else:
+                info = str(type(data_payload))
+            
+            stored_bytes = _H4_BUFFER_SLOTS[slot]["bytes"]
+            _log("📦 UNIVERSAL BUFFER UPDATE | Slot: '%s' | Info: %s | Residency: %s | %.1f MB -> %.1f MB", slot, info, residency, source_bytes / 1048576, stored_bytes / 1048576)
     
-    return new_count
+        _expire_slots()
+        _evict_slots(keep=slot)
 
-def reset_state():
-    """Resets the loop counter to zero (The Nuclear Reset)."""
-    global _H4_GLOBAL_STATE
+        if _sharing_buffer():
+            _publish_buffer(slot, data_payload, generation)
+
+def get_buffered_image(slot_name=None):
+    """Retrieves the stored payload for a slot (None if empty / evicted)."""
+    with _H4_BUFFER_LOCK:
+        _expire_slots()
+        slot = resolve_slot_name(slot_name)
+        entry = _H4_BUFFER_SLOTS.get(slot)
+        remote = _shared_buffer_record(slot)
+        if remote and (entry is None or remote["gen"] > entry["generation"]):
+            # Another worker wrote this slot more recently: map its file.
+            try:
+                return load_payload(remote["path"])
+            except Exception as e:
+                _log("⚠️ SHARED BUFFER READ FAILED | Slot: '%s' | %s", slot, e)
+        if entry is None:
+            return None
+        entry["last_access"] = time.time()
+        _H4_BUFFER_SLOTS.move_to_end(slot)
+        if entry["spill_path"]:
+            # Memory-mapped read: pages are only pulled in when a node touches the data.
+            payload = load_payload(entry["spill_path"])
+        else:
+            payload = entry["payload"]
+        return unpack_payload(payload, entry["plan"])
+
+def has_buffered_data(slot_name=None):
+    """True if a slot currently holds a payload (no load, no LRU touch)."""
+    with _H4_BUFFER_LOCK:
+        _expire_slots()
+        slot = resolve_slot_name(slot_name)
+        return slot in _H4_BUFFER_SLOTS or _shared_buffer_record(slot) is not None
+
+def get_buffer_generation(slot_name=None):
+    """Generation number of a slot's current payload (0 if empty)."""
+    with _H4_BUFFER_LOCK:
+        slot = resolve_slot_name(slot_name)
+        entry = _H4_BUFFER_SLOTS.get(slot)
+        remote = _shared_buffer_record(slot)
+        return max(entry["generation"] if entry else 0, remote["gen"] if remote else 0)
+
+def clear_buffer(slot_name=None):
+    """Frees one slot, or every slot when slot_name is '*'."""
+    with _H4_BUFFER_LOCK:
+        if slot_name == "*":
+            for slot in list(_H4_BUFFER_SLOTS):
+                _drop_slot(slot)
+            _log("🧹 BUFFER CLEARED | All slots")
+            return
+        slot = resolve_slot_name(slot_name)
+        if _drop_slot(slot) is not None:
+            _log("🧹 BUFFER CLEARED | Slot: '%s'", slot)
+
+def buffer_status():
+    """Occupancy report for the buffer (used by the /h4/buffer_status endpoint)."""
+    with _H4_BUFFER_LOCK:
+        _expire_slots()
+        now = time.time()
+        slots = []
+        for name, entry in _H4_BUFFER_SLOTS.items():
+            slots.append({
+                "slot": name,
+                "type": type(entry["payload"]).__name__,
+                "bytes": entry["bytes"],
+                "source_bytes": entry["source_bytes"],
+                "residency": entry["residency"],
+                "disk_bytes": entry["disk_bytes"],
+                "spilled": bool(entry["spill_path"]),
+                "generation": entry["generation"],
+                "age_s": round(now - entry["stored_at"], 3),
+                "idle_s": round(now - entry["last_access"], 3),
+            })
+        return {
+            "total_bytes": _buffer_total_bytes(),
+            "disk_bytes": sum(e["disk_bytes"] for e in _H4_BUFFER_SLOTS.values()),
+            "max_bytes": _H4_BUFFER_CONFIG["max_bytes"],
+            "ttl_seconds": _H4_BUFFER_CONFIG["ttl_seconds"],
+            "spill": _H4_BUFFER_CONFIG["spill"],
+            "shared_group": _SHARED.group if _sharing_buffer() else None,
+            "slots": slots,
+        }
+
+def _log(message, *args, level=INFO):
+    """Internal helper for timestamped logging (Rule 11). Routed through h4_logging."""
+    h4_log("CORE", message, *args, level=level)
+
+def enable_shared_state(group=None, size_kb=None):
+    """
+    Switches loop state + orbit storage to the cross-process backend.
+    Every worker that uses the same group name sees the same counters and flags.
+    """
+    global _SHARED
+    group = group or shared_group_name()
+    if not group:
+        return None
+    size = int(size_kb or os.environ.get("H4_SHARED_SIZE_KB", "1024")) * 1024
+    segment = SharedSegment(group, size)
+    _SHARED = segment
+    # First entry under the shared lock merges local state in and publishes it.
+    with _H4_STATE_LOCK:
+        pass
+    _log("🔗 SHARED STATE ENABLED | Group: '%s' | %s | %s KB | Buffer: %s", group, "created" if segment.created else "attached", size // 1024, "shared" if shared_buffer_enabled() else "local")
+    return segment
+
+def resolve_loop_name(loop_name=None):
+    """
+    Normalises a loop name into a registry namespace.
+    Empty / missing names fall back to the shared 'default' loop.
+    Callers may pass a node unique_id or prompt id to get a private loop.
+    """
+    if loop_name is None:
+        return DEFAULT_LOOP_NAME
+    name = str(loop_name).strip()
+    return name if name else DEFAULT_LOOP_NAME
+
+def _state_for(loop_name=None):
+    with _H4_STATE_LOCK:
+        ns = resolve_loop_name(loop_name)
+        state = _H4_STATE_REGISTRY.get(ns)
+        if state is None:
+            state = _new_state()
+            _H4_STATE_REGISTRY[ns] = state
+            _log("🆕 Loop Namespace Created | '%s'", ns)
+        return state
+
+def _orbit_for(loop_name=None):
+    with _H4_STATE_LOCK:
+        ns = resolve_loop_name(loop_name)
+        orbit = _H4_ORBIT_REGISTRY.get(ns)
+        if orbit is None:
+            orbit = {}
+            _H4_ORBIT_REGISTRY[ns] = orbit
+        return orbit
+
+def list_loop_names():
+    """Returns every namespace that currently holds loop state."""
+    with _H4_STATE_LOCK:
+        return sorted(set(_H4_STATE_REGISTRY) | set(_H4_ORBIT_REGISTRY))
+
+def get_state(loop_name=None):
+    """
+    Live state dict for a loop. Single-key reads are safe; use
+    get_state_snapshot() when several fields must agree with each other.
+    """
+    return _state_for(loop_name)
+
+def get_state_snapshot(loop_name=None):
+    """Consistent copy of one loop's state."""
+    with _H4_STATE_LOCK:
+        return dict(_state_for(loop_name))
+
+def snapshot_all():
+    """Consistent copy of every loop's state and orbit storage."""
+    with _H4_STATE_LOCK:
+        return {
+            "states": {ns: dict(st) for ns, st in _H4_STATE_REGISTRY.items()},
+            "orbits": {ns: dict(ob) for ns, ob in _H4_ORBIT_REGISTRY.items()},
+        }
+
+def orbit_set(key, value, loop_name=None):
+    with _H4_STATE_LOCK:
+        _orbit_for(loop_name)[key] = value
+
+def orbit_compare_and_set(key, expected, new_value, loop_name=None):
+    """Sets key to new_value only if it currently equals expected. Returns True on swap."""
+    with _H4_STATE_LOCK:
+        orbit = _orbit_for(loop_name)
+        if orbit.get(key, None) != expected:
+            return False
+        orbit[key] = new_value
+        return True
+
+def consume_reset_flag(loop_name=None):
+    """Atomically claims a pending wireless reset (True -> False). Only one caller wins."""
+    return orbit_compare_and_set("request_reset", True, False, loop_name)
+
+def consume_stop_flag(loop_name=None):
+    """Atomically claims a pending early-stop request (True -> False). Only one caller wins."""
+    return orbit_compare_and_set("request_stop", True, False, loop_name)
+
+def orbit_get(key, loop_name=None):
+    with _H4_STATE_LOCK:
+        return _orbit_for(loop_name).get(key, None)
+
+def increment_loop(loop_name=None):
+    """Safely increments the loop counter with nuclear logging."""
+    with _H4_STATE_LOCK:
+        ns = resolve_loop_name(loop_name)
+        state = _state_for(ns)
+    
+        old_count = state["loop_count"]
+        state["loop_count"] += 1
+        state["last_run_time"] = time.time()
     
-    old_count = _H4_GLOBAL_STATE["loop_count"]
-    _H4_GLOBAL_STATE["loop_count"] = 0
-    _H4_GLOBAL_STATE["last_run_time"] = time.time()
+        new_count = state["loop_count"]
+        _log("State UPDATE [%s] | Increment | %s -> %s", ns, old_count, new_count)
     
-    _log(f"☢️ NUCLEAR RESET TRIGGERED | {old_count} -> 0")
+        return new_count
+
+# Called with the namespace after every reset_state (per-loop memory elsewhere, e.g. Convergence Monitor).
+_RESET_LISTENERS = []
+
+def on_loop_reset(listener):
+    """Registers listener(namespace), called whenever a loop is reset."""
+    if listener not in _RESET_LISTENERS:
+        _RESET_LISTENERS.append(listener)
+
+def _reset_locked(loop_name):
+    """Zeroes the counter. Caller holds _H4_STATE_LOCK; returns the namespace."""
+    ns = resolve_loop_name(loop_name)
+    state = _state_for(ns)
+
+    old_count = state["loop_count"]
+    state["loop_count"] = 0
+    state["last_run_time"] = time.time()
+
+    _log("☢️ NUCLEAR RESET TRIGGERED [%s] | %s -> 0", ns, old_count)
+    return ns
+
+def _notify_reset(ns):
+    # Outside every lock: listeners may take their own (or the buffer) lock.
+    for listener in _RESET_LISTENERS:
+        try:
+            listener(ns)
+        except Exception as e:
+            _log("⚠️ Reset listener failed [%s] | %s", ns, e, level=WARNING)
+
+def reset_state(loop_name=None):
+    """Resets the loop counter to zero (The Nuclear Reset)."""
+    with _H4_STATE_LOCK:
+        ns = _reset_locked(loop_name)
+    _notify_reset(ns)
+    return 0
+
+def advance_loop(loop_name=None, restart=False):
+    """
+    Atomic 'read then bump' used by the routing nodes.
+    Returns the count for THIS run: 0 on restart, otherwise the current
+    count (and the stored counter moves on to the next run).
+    """
+    with _H4_STATE_LOCK:
+        if not restart:
+            current = _state_for(loop_name)["loop_count"]
+            increment_loop(loop_name)
+            return current
+        ns = _reset_locked(loop_name)
+    _notify_reset(ns)
     return 0
+
+def state_fingerprint(loop_name=None, orbit_keys=(), slot_name=None, include_touch=False):
+    """
+    Cache key for IS_CHANGED. Changes only when what a node reads can change:
+    - the loop count (and, with include_touch, the time of the last increment/reset)
+    - the listed orbit keys
+    - the buffer generation of slot_name (pass None to ignore the buffer)
+    Nodes that mutate state should set include_touch so their own writes invalidate them.
+    """
+    with _H4_STATE_LOCK:
+        ns = resolve_loop_name(loop_name)
+        state = _state_for(ns)
+        parts = [f"{ns}:{state['loop_count']}"]
+        if include_touch:
+            parts.append(f"t={state['last_run_time']!r}")
+        orbit = _orbit_for(ns)
+        parts.extend(f"{key}={orbit.get(key)!r}" for key in orbit_keys)
+    if slot_name is not None:
+        parts.append(f"gen={get_buffer_generation(slot_name)}")
+    return "|".join(parts)
+
+def load_snapshot(snapshot):
+    """
+    Replaces loop state + orbit storage with a snapshot_all()-style dict.
+    Existing dict objects are updated in place so legacy references
+    (_H4_GLOBAL_STATE / _H4_ORBIT_STORAGE) stay valid.
+    """
+    with _H4_STATE_LOCK:
+        for ns, st in snapshot.get("states", {}).items():
+            state = _state_for(ns)
+            state.clear()
+            state.update(_new_state())
+            state.update(st)
+        for ns, ob in snapshot.get("orbits", {}).items():
+            orbit = _orbit_for(ns)
+            orbit.clear()
+            orbit.update(ob)
+        _log("♻️ STATE RESTORED | Loops: %s", list(snapshot.get("states", {}).keys()))
+
+def export_buffer():
+    """
+    Returns {slot: (payload, residency)} for every occupied slot.
+    Payloads come back in their original dtype (spilled slots are memory-mapped).
+    """
+    with _H4_BUFFER_LOCK:
+        exported = {}
+        for slot, entry in _H4_BUFFER_SLOTS.items():
+            # Read directly (not via get_buffered_image) so snapshots don't refresh LRU / TTL.
+            payload = load_payload(entry["spill_path"]) if entry["spill_path"] else entry["payload"]
+            exported[slot] = (unpack_payload(payload, entry["plan"]), entry["residency"])
+        return exported
+
+# Opt-in cross-process backend (H4_SHARED_STATE=<group>).
+if shared_group_name():
+    try:
+        enable_shared_state()
+    except Exception as e:
+        _log("❌ SHARED STATE UNAVAILABLE | %s (staying process-local)", e, level=ERROR)
@@ -12,6 +12,7 @@ from PIL import Image, ImageOps, ImageSequence
 from server import PromptServer
 from aiohttp import web
 from .h4_core import _log
+from .h4_logging import h4_log, ERROR
 
 # ------------------------------------------------------------------------------
 # API: Server-Side Folder Browser (Localhost Only)
@@ -42,7 +43,7 @@ async def h4_browse_folder(request):
         
         return web.json_response({"path": folder_path})
     except Exception as e:
-        print(f"[H4_DataStream] Browser Error: {e}")
+        h4_log("H4_DataStream", "Browser Error: %s", e, level=ERROR)
         return web.json_response({"path": "", "error": str(e)})
 
 class H4_DataStream:
@@ -108,13 +108,13 @@ def get_swap_model(model_name: str):
         else:
             providers = ["CPUExecutionProvider"]
 
-        _log(f"DEBUG: Initializing ONNX session with providers: {providers}")
+        _log("Initializing ONNX session with providers: %s", providers, level="DEBUG")
         
         if "hyperswap" in model_name.lower():
             import onnxruntime as ort
             # Verify if CUDA is actually available in ORT
             available_providers = ort.get_available_providers()
-            _log(f"DEBUG: ORT Available Providers: {available_providers}")
+            _log("ORT Available Providers: %s", available_providers, level="DEBUG")
             
             model = ort.InferenceSession(model_path, providers=providers)
         else:
@@ -375,7 +375,7 @@ class H4_FaceForge:
         # === Validation ===
         # 0. SFW Check (The Boobies Switch)
         is_safe = check_image_safety(input_image)
-        _log(f"DEBUG: SFW Check Result: {'SAFE' if is_safe else 'NSFW'}")
+        _log("SFW Check Result: %s", 'SAFE' if is_safe else 'NSFW', level="DEBUG")
         
         if not is_safe:
             _log("SFW Block Active: Content flagged as NSFW.", level="WARNING")
@@ -405,18 +405,18 @@ class H4_FaceForge:
         target_indices = parse_face_indices(target_face_index)
         source_indices = parse_face_indices(source_face_index)
         
-        _log(f"DEBUG: Target Indices: {target_indices}")
-        _log(f"DEBUG: Source Indices: {source_indices}")
+        _log("Target Indices: %s", target_indices, level="DEBUG")
+        _log("Source Indices: %s", source_indices, level="DEBUG")
         
         # Get source face
         source_face = None
         if swap_enabled:
-            _log("DEBUG: Swap Enabled. Resolving Source Face...")
+            _log("Swap Enabled. Resolving Source Face...", level="DEBUG")
             if face_model is not None:
                 source_face = face_model
-                _log("DEBUG: Using provided Face Model as source.")
+                _log("Using provided Face Model as source.", level="DEBUG")
             elif source_image is not None:
-                _log("DEBUG: Analyzing Source Image for faces...")
+                _log("Analyzing Source Image for faces...", level="DEBUG")
                 source_pil = tensor_to_pil(source_image)
                 source_bgr = cv2.cvtColor(np.array(source_pil), cv2.COLOR_RGB2BGR)
                 source_faces = analyze_faces(source_bgr)
@@ -426,7 +426,7 @@ class H4_FaceForge:
                     idx = min(source_indices[0], len(sorted_source) - 1)
                     source_face = sorted_source[idx]
                     output_face_model = source_face
-                    _log(f"DEBUG: Detected {len(source_faces)} source face(s). Using face #{idx}")
+                    _log("Detected %s source face(s). Using face #%s", len(source_faces), idx, level="DEBUG")
                 else:
                     _log(f"❌ ERROR: NO FACES detected in source image!", level="ERROR")
                     return (input_image, None, input_image)
@@ -434,7 +434,7 @@ class H4_FaceForge:
                 _log("❌ ERROR: Swap enabled but no Source Image OR Face Model!", level="ERROR")
                 return (input_image, None, input_image)
         else:
-             _log("DEBUG: Swap is DISABLED.")
+             _log("Swap is DISABLED.", level="DEBUG")
         
         # === Process Each Image ===
         result_images = []
@@ -448,12 +448,12 @@ class H4_FaceForge:
             # Detect target faces
             target_faces = analyze_faces(img_bgr)
             if not target_faces:
-                _log(f"DEBUG: Image {img_idx}: No target faces detected. Skipping.", level="WARNING")
+                _log("Image %s: No target faces detected. Skipping.", img_idx, level="WARNING")
                 result_images.append(pil_img)
                 pbar.update(1)
                 continue
             
-            _log(f"DEBUG: Image {img_idx}: Found {len(target_faces)} target face(s).")
+            _log("Image %s: Found %s target face(s).", img_idx, len(target_faces), level="DEBUG")
             sorted_targets = sort_faces_by_order(target_faces, face_selection_mode)
             
             # === SAM Occlusion Masks ===
@@ -599,9 +599,9 @@ class H4_FaceForge:
             output = output.transpose(1, 2, 0)[:, :, ::-1]
             
             # Paste back with gradient mask
-            _log(f"DEBUG: Pasting back face with shape {output.shape} using Matrix {M.shape}")
+            _log("Pasting back face with shape %s using Matrix %s", output.shape, M.shape, level="DEBUG")
             img_bgr = self._paste_back_gradient(img_bgr, output, M, 256)
-            _log("DEBUG: Paste back complete.")
+            _log("Paste back complete.", level="DEBUG")
             
         except Exception as e:
             _log(f"HyperSwap inference failed: {e}", level="ERROR")
@@ -13,18 +13,17 @@ from typing import List, Optional, Tuple
 import folder_paths
 import logging
 
+from ..h4_logging import h4_log
+
 # ------------------------------------------------------------------------------
 # Logging
 # ------------------------------------------------------------------------------
-def _log(message: str, level: str = "INFO"):
+def _log(message: str, *args, level: str = "INFO"):
     """
     Internal logging function for FaceForge module.
-    Outputs timestamped messages to console.
+    Routed through the shared h4 logger (level-gated, lazy %-args).
     """
-    from datetime import datetime
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    prefix = f"[h4_FaceForge] [{timestamp}]"
-    print(f"{prefix} [{level}] {message}")
+    h4_log("FaceForge", message, *args, level=level)
 
 # ------------------------------------------------------------------------------
 # Image Conversions
@@ -135,40 +135,32 @@ class H4_Gridinator:
     # LOGIC: Helpers
     # --------------------------------------------------------------------------
 
+    @staticmethod
+    def fuzzy_match(folder, name):
+        """Exact file name first, else the first file containing name (case-insensitive). None if nothing fits."""
+        all_files = folder_paths.get_filename_list(folder)
+        if name in all_files:
+            return name
+        for candidate in all_files:
+            if name.lower() in candidate.lower():
+                return candidate
+        return None
+
     def fuzzy_load_checkpoint(self, name):
         """Loads a checkpoint by fuzzy matching the name."""
-        all_checks = folder_paths.get_filename_list("checkpoints")
-        
-        # Exact match
-        if name in all_checks:
-            ckpt_path = folder_paths.get_full_path("checkpoints", name)
-            return comfy.sd.load_checkpoint_guess_config(ckpt_path)
-
-        # Fuzzy match
-        for ckpt in all_checks:
-            if name.lower() in ckpt.lower():
-                _log(f"Gridinator: Fuzzy loaded '{ckpt}' for input '{name}'")
-                ckpt_path = folder_paths.get_full_path("checkpoints", ckpt)
-                return comfy.sd.load_checkpoint_guess_config(ckpt_path)
-                
-        raise ValueError(f"Gridinator: Cound not find checkpoint '{name}'")
+        ckpt = self.fuzzy_match("checkpoints", name)
+        if ckpt is None:
+            raise ValueError(f"Gridinator: Cound not find checkpoint '{name}'")
+        if ckpt != name:
+            _log(f"Gridinator: Fuzzy loaded '{ckpt}' for input '{name}'")
+        ckpt_path = folder_paths.get_full_path("checkpoints", ckpt)
+        return comfy.sd.load_checkpoint_guess_config(ckpt_path)
 
     def fuzzy_load_lora(self, name, model, clip, strength):
         """Loads a LoRA by fuzzy matching the name and applies it."""
         if name == "None": return model, clip
         
-        all_loras = folder_paths.get_filename_list("loras")
-        target_lora = None
-        
-        # Exact match
-        if name in all_loras:
-            target_lora = name
-        else:
-            # Fuzzy match
-            for lora in all_loras:
-                if name.lower() in lora.lower():
-                    target_lora = lora
-                    break
+        target_lora = self.fuzzy_match("loras", name)
         
         if target_lora:
             _log(f"Gridinator: Applying LoRA '{target_lora}' at strength {strength}")
@@ -529,5 +521,32 @@ class H4_Gridinator:
         return canvas
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        return float("nan")
+    def IS_CHANGED(cls, base_model=None, base_model_fuzzy=None, image_upload=None, **kwargs):
+        # Everything else is a widget value (already part of Comfy's cache key).
+        # Only files on disk can change behind our back: the upload, and every
+        # checkpoint / LoRA generate_grid would resolve (same fuzzy matching).
+        def stamp(tag, path):
+            stamps.append(f"{tag}={os.path.getmtime(path) if path and os.path.exists(path) else 'missing'}")
+
+        stamps = []
+        if image_upload and image_upload != "undefined":
+            stamp("img", folder_paths.get_annotated_filepath(image_upload))
+
+        axes = []
+        for axis in ("x", "y", "z"):
+            mode = kwargs.get(f"grid_{axis}_mode")
+            override = kwargs.get(f"grid_{axis}_override")
+            values = override.strip() if override and override.strip() else (kwargs.get(f"grid_{axis}_val") or "")
+            axes.append((mode, [v.strip() for v in str(values).split(",") if v.strip()]))
+
+        checkpoints = [v for mode, vals in axes if mode == "Model" for v in vals]
+        if not checkpoints:
+            checkpoints = [base_model_fuzzy.strip() if base_model_fuzzy and base_model_fuzzy.strip() else base_model]
+        for name in checkpoints:
+            match = cls.fuzzy_match("checkpoints", name) if name else None
+            stamp(f"ckpt:{match}", folder_paths.get_full_path("checkpoints", match) if match else None)
+
+        for name in (v for mode, vals in axes if mode == "LoRA" for v in vals if v != "None"):
+            match = cls.fuzzy_match("loras", name)
+            stamp(f"lora:{match}", folder_paths.get_full_path("loras", match) if match else None)
+        return "|".join(stamps)
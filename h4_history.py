@@ -0,0 +1,175 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_history.py
+# ------------------------------------------------------------------------------
+# H4 Frame History (Ring Buffer)
+# Rule 1 (No Placeholders): Real preallocated storage, in-place writes.
+# Rule 20 (Clairvoyant Development): Frames are written twice (slot p and p+N)
+# into a 2N "mirrored" tensor, so the last k frames are ALWAYS one contiguous
+# slice. Reads are views: no torch.cat, no per-iteration allocation.
+# ------------------------------------------------------------------------------
+import threading
+
+import torch
+
+from .h4_core import _log
+from .h4_utils import ANY_TYPE
+
+
+class FrameRing:
+    """Fixed-capacity history of frames shaped like one batch item ([H,W,C] or [C,H,W])."""
+
+    def __init__(self, capacity, frame_shape, dtype, device, latent=False):
+        self.capacity = int(capacity)
+        self.latent = latent
+        self.frame_shape = tuple(frame_shape)
+        self.storage = torch.empty((2 * self.capacity, *self.frame_shape), dtype=dtype, device=device)
+        self.count = 0
+        nbytes = self.storage.element_size() * self.storage.nelement()
+        _log("🎞️ HISTORY ALLOCATED | %s x %s | %s on %s | %.1f MB (mirrored)", self.capacity, list(self.frame_shape), dtype, device, nbytes / 1048576)
+
+    def matches(self, capacity, batch):
+        return (
+            self.capacity == capacity
+            and tuple(batch.shape[1:]) == self.frame_shape
+            and batch.dtype == self.storage.dtype
+            and batch.device == self.storage.device
+        )
+
+    def write(self, batch):
+        """Copies a [B, ...] batch into the next slots in place (oldest frames are overwritten)."""
+        n_cap = self.capacity
+        if batch.shape[0] > n_cap:
+            self.count += batch.shape[0] - n_cap
+            batch = batch[-n_cap:]
+        i = 0
+        total = batch.shape[0]
+        while i < total:
+            p = self.count % n_cap
+            n = min(total - i, n_cap - p)
+            chunk = batch[i:i + n]
+            self.storage[p:p + n].copy_(chunk)
+            self.storage[p + n_cap:p + n_cap + n].copy_(chunk)
+            self.count += n
+            i += n
+
+    @property
+    def filled(self):
+        return min(self.count, self.capacity)
+
+    def last(self, k):
+        """View of the last k frames, oldest first, as one [k, ...] tensor."""
+        k = max(0, min(int(k), self.filled))
+        if k == 0:
+            return self.storage[:0]
+        end = (self.count - 1) % self.capacity + self.capacity + 1
+        return self.storage[end - k:end]
+
+
+_H4_HISTORY = {}
+_H4_HISTORY_LOCK = threading.Lock()
+
+
+def history_write(name, batch, capacity, latent=False):
+    """Appends a batch to the named history, (re)allocating only if shape / capacity changed."""
+    with _H4_HISTORY_LOCK:
+        ring = _H4_HISTORY.get(name)
+        if ring is None or not ring.matches(capacity, batch):
+            if ring is not None:
+                _log("🎞️ HISTORY RESHAPED | '%s' | Frame shape or capacity changed, starting fresh.", name)
+            ring = _H4_HISTORY[name] = FrameRing(capacity, batch.shape[1:], batch.dtype, batch.device, latent)
+        ring.write(batch)
+        return ring
+
+
+def history_get(name):
+    """The named FrameRing (None if it doesn't exist yet)."""
+    with _H4_HISTORY_LOCK:
+        return _H4_HISTORY.get(name)
+
+
+def history_clear(name):
+    with _H4_HISTORY_LOCK:
+        _H4_HISTORY.pop(name, None)
+
+
+class H4_FrameHistory:
+    """
+    🎞️ H4 Frame History (Ring Buffer)
+    Keeps the last N loop outputs (IMAGE or LATENT) in one preallocated tensor
+    and hands back the most recent k as a single batch.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "history_name": ("STRING", {
+                    "default": "h4_history",
+                    "multiline": False,
+                    "tooltip": "Nodes with the same name share one history."
+                }),
+                "capacity": ("INT", {
+                    "default": 8, "min": 1, "max": 4096,
+                    "tooltip": "How many frames to keep. Memory = 2 x capacity x frame size (mirrored for zero-copy reads)."
+                }),
+                "last_k": ("INT", {
+                    "default": 4, "min": 1, "max": 4096,
+                    "tooltip": "How many recent frames to output (oldest first)."
+                }),
+                "reset": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "True = Forget the history before writing."
+                }),
+            },
+            "optional": {
+                "frame_in": (ANY_TYPE, {"tooltip": "IMAGE or LATENT to append. Leave empty to only read."}),
+            }
+        }
+
+    RETURN_TYPES = (ANY_TYPE, "INT")
+    RETURN_NAMES = ("history", "frames_stored")
+    FUNCTION = "process_history"
+    CATEGORY = "h4_Live/Logic"
+
+    DESCRIPTION = """
+    🎞️ **H4 Frame History (Ring Buffer)**
+
+    Remembers the last N frames of your loop for temporal smoothing
+    or looping animation. Outputs the last `k` frames as one batch.
+
+    **Note:** `history` is a view into shared storage. It is valid until the
+    next write, so use it in the same run.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return float("nan")
+
+    def process_history(self, history_name, capacity, last_k, reset, frame_in=None):
+        node_id = "FrameHistory"
+
+        if reset:
+            history_clear(history_name)
+            _log("[%s] 🧹 History '%s' cleared.", node_id, history_name)
+
+        is_latent = isinstance(frame_in, dict) and "samples" in frame_in
+        batch = frame_in["samples"] if is_latent else frame_in
+
+        if batch is not None:
+            if not torch.is_tensor(batch) or batch.dim() < 2:
+                raise ValueError(f"[{node_id}] frame_in must be an IMAGE tensor or a LATENT dict, got {type(frame_in).__name__}.")
+            ring = history_write(history_name, batch, capacity, is_latent)
+        else:
+            ring = history_get(history_name)
+            if ring is None:
+                raise ValueError(f"[{node_id}] History '{history_name}' is empty. Connect frame_in at least once.")
+
+        # last() is a live view of the ring; the next write() would rewrite it under
+        # ComfyUI's output cache and any buffer that kept it. Hand out a copy.
+        frames = ring.last(last_k).clone()
+        if ring.latent:
+            # Per-item keys (batch_index, noise_mask) no longer line up with the history batch.
+            extra = frame_in if is_latent else {}
+            out = {k: v for k, v in extra.items() if k not in ("samples", "batch_index", "noise_mask")}
+            out["samples"] = frames
+            return (out, ring.filled)
+        return (frames, ring.filled)
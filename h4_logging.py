@@ -0,0 +1,186 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_logging.py
+# ------------------------------------------------------------------------------
+# H4 Logging Subsystem
+# Rule 11 (Logging): One logger for the whole pack, same "[h4_Live][NODE][ts]" look.
+# Rule 21 (Debug Review): Recent lines kept in a ring buffer for /h4/logs.
+#
+# - Level gating:   H4_LOG_LEVEL (DEBUG / INFO / WARNING / ERROR). Default INFO.
+#                   GOD MODE + per-input reports are DEBUG, so they cost nothing by default.
+# - Lazy messages:  h4_log("Node", "Shape: %s", shape) only formats if the level is on.
+# - Rate limiting:  Identical lines repeated inside H4_LOG_REPEAT_WINDOW seconds are
+#                   collapsed after H4_LOG_REPEAT_BURST copies ("... repeated N more times").
+# - Ring buffer:    Last H4_LOG_RING_SIZE records, served by GET /h4/logs.
+# ------------------------------------------------------------------------------
+import datetime
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from server import PromptServer
+from aiohttp import web
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+_LEVEL_NAMES = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "WARN": WARNING, "ERROR": ERROR, "CRITICAL": logging.CRITICAL}
+
+_RING = deque(maxlen=int(os.environ.get("H4_LOG_RING_SIZE", "1000")))
+_SEQ = itertools.count(1)
+
+
+def _coerce_level(level):
+    if isinstance(level, int):
+        return level
+    return _LEVEL_NAMES.get(str(level).upper(), INFO)
+
+
+class _RepeatFilter(logging.Filter):
+    """Collapses bursts of identical lines (per component) inside a short window."""
+
+    def __init__(self, window, burst):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.window <= 0:
+            return True
+        key = (record.h4_component, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            first, count, suppressed = self._seen.get(key, (now, 0, 0))
+            if now - first > self.window:
+                if suppressed:
+                    record.h4_suffix = f"  (... repeated {suppressed} more times)"
+                self._seen[key] = (now, 1, 0)
+                self._prune(now)
+                return True
+            if count < self.burst:
+                self._seen[key] = (first, count + 1, suppressed)
+                return True
+            self._seen[key] = (first, count, suppressed + 1)
+            return False
+
+    def _prune(self, now):
+        if len(self._seen) > 512:
+            stale = [k for k, (first, _, _) in self._seen.items() if now - first > self.window]
+            for k in stale:
+                self._seen.pop(k, None)
+
+
+class _H4Formatter(logging.Formatter):
+    def format(self, record):
+        ts = datetime.datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        level = "" if record.levelno == INFO else f"[{record.levelname}]"
+        return f"[h4_Live][{record.h4_component}][{ts}]{level} {record.getMessage()}{getattr(record, 'h4_suffix', '')}"
+
+
+class _RingHandler(logging.Handler):
+    def emit(self, record):
+        try:
+            _RING.append({
+                "seq": next(_SEQ),
+                "time": record.created,
+                "level": record.levelname,
+                "component": record.h4_component,
+                "message": record.getMessage() + getattr(record, "h4_suffix", ""),
+            })
+        except Exception:
+            self.handleError(record)
+
+
+def _build_logger():
+    logger = logging.getLogger("h4_Live")
+    logger.setLevel(_coerce_level(os.environ.get("H4_LOG_LEVEL", "INFO")))
+    logger.propagate = False
+    if not logger.handlers:
+        repeat = _RepeatFilter(
+            window=float(os.environ.get("H4_LOG_REPEAT_WINDOW", "2.0")),
+            burst=int(os.environ.get("H4_LOG_REPEAT_BURST", "3")),
+        )
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(_H4Formatter())
+        ring = _RingHandler()
+        # Filter on the logger so console + ring agree on what was suppressed.
+        logger.addFilter(repeat)
+        logger.addHandler(console)
+        logger.addHandler(ring)
+    return logger
+
+
+_LOGGER = _build_logger()
+
+
+def set_level(level):
+    """
+    Changes the gate at runtime (e.g. from the Mission Control debug toggle).
+    Raises ValueError for a level name that is not in _LEVEL_NAMES.
+    """
+    if not isinstance(level, int) and str(level).upper() not in _LEVEL_NAMES:
+        raise ValueError(f"Unknown log level {level!r}. Use one of: {', '.join(_LEVEL_NAMES)}.")
+    _LOGGER.setLevel(_coerce_level(level))
+
+
+def is_enabled(level=INFO):
+    """Guard for messages that are expensive to build (tensor shapes, dict dumps)."""
+    return _LOGGER.isEnabledFor(_coerce_level(level))
+
+
+def h4_log(component, message, *args, level=INFO):
+    """
+    Logs one line for a component. %-style args are only formatted if the
+    level is enabled; message may also be a zero-arg callable for heavy reports.
+    """
+    lvl = _coerce_level(level)
+    if not _LOGGER.isEnabledFor(lvl):
+        return
+    if callable(message):
+        message = message()
+    _LOGGER.log(lvl, message, *args, extra={"h4_component": component})
+
+
+def recent_logs(since=0, limit=500, level=None):
+    """Ring buffer records with seq > since (oldest first)."""
+    floor = _coerce_level(level) if level else 0
+    records = [r for r in list(_RING) if r["seq"] > since and _LEVEL_NAMES.get(r["level"], 0) >= floor]
+    return records[-limit:] if limit else records
+
+
+# ------------------------------------------------------------------------------
+# Web API Endpoints
+# ------------------------------------------------------------------------------
+@PromptServer.instance.routes.get("/h4/logs")
+async def h4_get_logs(request):
+    """
+    Recent h4 log lines from the in-memory ring buffer.
+    Query: since=<seq> (only newer), limit=<n>, level=<DEBUG|INFO|WARNING|ERROR>.
+    """
+    query = request.rel_url.query
+    try:
+        since = int(query.get("since", 0))
+        limit = int(query.get("limit", 500))
+    except ValueError:
+        return web.json_response({"error": "since/limit must be integers"}, status=400)
+    records = recent_logs(since=since, limit=limit, level=query.get("level"))
+    last_seq = records[-1]["seq"] if records else since
+    return web.json_response({"logs": records, "last_seq": last_seq})
+
+
+@PromptServer.instance.routes.post("/h4/log_level")
+async def h4_set_log_level(request):
+    """Changes the h4 log gate at runtime. Body: {"level": "DEBUG"}."""
+    body = await request.json()
+    level = str(body.get("level", "INFO")).upper()
+    try:
+        set_level(level)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    return web.json_response({"level": level})
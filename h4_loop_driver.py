@@ -0,0 +1,221 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_loop_driver.py
+# ------------------------------------------------------------------------------
+# H4 Loop Driver (In-Process Loops)
+# Rule 1 (No Placeholders): Real iteration inside ONE prompt execution.
+# Rule 20 (Clairvoyant Development): Uses ComfyUI node expansion. H4_LoopEnd
+# clones only the nodes BETWEEN Loop Start and Loop End for the next pass, so
+# model loaders / CLIP encoders outside the body stay cached. No re-queue, no
+# re-validation, no NaN cache misses per iteration.
+# ------------------------------------------------------------------------------
+from .h4_core import _log, advance_loop, reset_state, buffer_image, resolve_loop_name, consume_stop_flag
+from .h4_convergence import reset_monitor
+from .h4_utils import ANY_TYPE, LOOP_NAME_INPUT, SLOT_NAME_INPUT
+
+# Node expansion needs the newer ComfyUI execution engine.
+try:
+    from comfy_execution.graph_utils import GraphBuilder, is_link
+except ImportError:
+    GraphBuilder = None
+    is_link = None
+
+LOOP_FLOW_TYPE = "H4_LOOP"
+
+
+class H4_LoopStart:
+    """
+    🔁 H4 Loop Start (Driver)
+    Opens an in-process loop. Feeds first_value on iteration 0, then the
+    value H4_LoopEnd hands back on every following iteration.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "first_value": (ANY_TYPE, {"tooltip": "Starting item (Image, Latent...) for iteration 0."}),
+                "iterations": ("INT", {
+                    "default": 4, "min": 1, "max": 10000,
+                    "tooltip": "How many times the body runs in this ONE queue."
+                }),
+                "restart": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "True = Reset the h4 loop counter to 0 when the loop starts."
+                }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+                "slot_name": SLOT_NAME_INPUT,
+                # Filled in by H4_LoopEnd on the cloned Loop Start. Leave unconnected.
+                "loop_value": (ANY_TYPE, {"tooltip": "Internal: set by H4_LoopEnd. Leave empty."}),
+                "iteration": ("INT", {"forceInput": True, "tooltip": "Internal: set by H4_LoopEnd. Leave empty."}),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID"
+            }
+        }
+
+    RETURN_TYPES = (LOOP_FLOW_TYPE, ANY_TYPE, "INT")
+    RETURN_NAMES = ("loop_flow", "value", "iteration")
+    FUNCTION = "open_loop"
+    CATEGORY = "h4_Live/Logic"
+
+    DESCRIPTION = """
+    🔁 **H4 Loop Start (Driver)**
+
+    Runs a loop N times inside ONE queue (no re-queueing).
+
+    **Usage:**
+    1. `value` -> your loop body (KSampler, upscale...).
+    2. Body result -> `H4_LoopEnd.value`.
+    3. `loop_flow` -> `H4_LoopEnd.loop_flow`.
+
+    Nodes that do not depend on Loop Start (model loaders, prompts)
+    run once and stay cached for every iteration.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return float("nan")
+
+    def open_loop(self, first_value, iterations, restart, loop_name=None, slot_name=None, loop_value=None, iteration=None, unique_id=None):
+        node_id = "LoopStart"
+        index = int(iteration or 0)
+
+        if index == 0:
+            if restart:
+                reset_state(loop_name)
+            # A stop request or a convergence baseline left over from an earlier loop must not end this one.
+            consume_stop_flag(loop_name)
+            reset_monitor(loop_name)
+            value = first_value
+            _log("[%s] 🔁 LOOP OPEN | Loop: %s | Iterations: %s", node_id, resolve_loop_name(loop_name), iterations)
+        else:
+            if loop_value is None:
+                raise ValueError(f"[{node_id}] Iteration {index} received no value from H4_LoopEnd.")
+            value = loop_value
+
+        # Keep the shared counter in step so Mission Control / Schedulers see the iteration.
+        run_id = advance_loop(loop_name)
+        _log("[%s] ▶️ Iteration %s/%s | Run ID: %s", node_id, index + 1, iterations, run_id)
+
+        flow = {
+            "open_id": unique_id,
+            "iteration": index,
+            "iterations": int(iterations),
+            "loop_name": loop_name,
+            "slot_name": slot_name,
+        }
+        return (flow, value, index)
+
+
+class H4_LoopEnd:
+    """
+    🔁 H4 Loop End (Driver)
+    Closes the loop. Until the iteration budget is spent it expands into a
+    fresh copy of the loop body, fed with this iteration's result.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "loop_flow": (LOOP_FLOW_TYPE, {"tooltip": "Connect from H4_LoopStart.loop_flow."}),
+                "value": (ANY_TYPE, {"tooltip": "Result of the loop body for this iteration."}),
+            },
+            "hidden": {
+                "dynprompt": "DYNPROMPT",
+                "unique_id": "UNIQUE_ID",
+            }
+        }
+
+    RETURN_TYPES = (ANY_TYPE, "INT")
+    RETURN_NAMES = ("final_value", "iterations_done")
+    FUNCTION = "close_loop"
+    CATEGORY = "h4_Live/Logic"
+
+    DESCRIPTION = """
+    🔁 **H4 Loop End (Driver)**
+
+    Sends `value` back to H4_LoopStart until all iterations are done,
+    then outputs the final result (or earlier, if a Convergence Monitor
+    requests a stop). Every iteration is also written to
+    the Universal Buffer (`slot_name` on Loop Start), so wireless
+    nodes and the next queue can pick it up.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        return float("nan")
+
+    def _explore_dependencies(self, node_id, dynprompt, upstream):
+        """Builds parent -> [children] for everything upstream of node_id."""
+        node_info = dynprompt.get_node(node_id)
+        for v in node_info.get("inputs", {}).values():
+            if is_link(v):
+                parent_id = v[0]
+                if parent_id not in upstream:
+                    upstream[parent_id] = []
+                    self._explore_dependencies(parent_id, dynprompt, upstream)
+                upstream[parent_id].append(node_id)
+
+    def _collect_body(self, node_id, upstream, body):
+        """Every node downstream of node_id (within the upstream map) is part of the body."""
+        for child_id in upstream.get(node_id, []):
+            if child_id not in body:
+                body.add(child_id)
+                self._collect_body(child_id, upstream, body)
+
+    def close_loop(self, loop_flow, value, dynprompt=None, unique_id=None):
+        node_id = "LoopEnd"
+
+        if not isinstance(loop_flow, dict) or "open_id" not in loop_flow:
+            raise ValueError(f"[{node_id}] 'loop_flow' must come from H4_LoopStart.")
+
+        index = loop_flow["iteration"]
+        total = loop_flow["iterations"]
+        buffer_image(value, loop_flow["slot_name"])
+
+        if index + 1 >= total:
+            _log("[%s] 🏁 LOOP DONE | %s iteration(s)", node_id, total)
+            return (value, total)
+
+        if consume_stop_flag(loop_flow["loop_name"]):
+            _log("[%s] 🛑 EARLY STOP | Converged after %s/%s iteration(s)", node_id, index + 1, total)
+            return (value, index + 1)
+
+        if GraphBuilder is None or dynprompt is None:
+            raise RuntimeError(f"[{node_id}] This ComfyUI build has no node expansion support. Please update ComfyUI.")
+
+        open_id = loop_flow["open_id"]
+        upstream = {}
+        self._explore_dependencies(unique_id, dynprompt, upstream)
+        body = set()
+        self._collect_body(open_id, upstream, body)
+        body.update((open_id, unique_id))
+
+        # "Recurse" keeps clone ids from growing with every iteration's prefix.
+        def clone_key(nid):
+            return "Recurse" if nid == unique_id else nid
+
+        graph = GraphBuilder()
+        for nid in body:
+            node = graph.node(dynprompt.get_node(nid)["class_type"], clone_key(nid))
+            node.set_override_display_id(nid)
+        for nid in body:
+            node = graph.lookup_node(clone_key(nid))
+            for k, v in dynprompt.get_node(nid)["inputs"].items():
+                if is_link(v) and v[0] in body:
+                    node.set_input(k, graph.lookup_node(clone_key(v[0])).out(v[1]))
+                else:
+                    node.set_input(k, v)
+
+        next_open = graph.lookup_node(open_id)
+        next_open.set_input("loop_value", value)
+        next_open.set_input("iteration", index + 1)
+
+        _log("[%s] 🔂 Expanding body (%s nodes) for iteration %s/%s", node_id, len(body), index + 2, total)
+        next_end = graph.lookup_node("Recurse")
+        return {
+            "result": (next_end.out(0), next_end.out(1)),
+            "expand": graph.finalize(),
+        }
@@ -0,0 +1,249 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_memo.py
+# ------------------------------------------------------------------------------
+# H4 Memo (Content-Addressed Result Cache)
+# Rule 1 (No Placeholders): Real hashing, real RAM + disk tiers.
+# Rule 20 (Clairvoyant Development): The expensive branch is a LAZY input.
+# On a cache hit it is never requested, so ComfyUI never runs it - no matter
+# how many NaN IS_CHANGED nodes sit upstream.
+#   key_source (cheap) + user_key -> blake2b fingerprint
+#   -> RAM tier (LRU, H4_MEMO_RAM_MB) -> disk tier (safetensors, H4_MEMO_DIR)
+# ------------------------------------------------------------------------------
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import torch
+
+from .h4_core import _log, payload_nbytes
+from .h4_tensor_io import save_payload, load_payload, is_spillable, map_tensors
+from .h4_utils import ANY_TYPE
+
+TIERS = ["RAM + Disk", "RAM Only", "Bypass"]
+
+_RAM = OrderedDict()  # fingerprint -> (CPU payload, bytes, source devices)
+_RAM_LOCK = threading.Lock()
+_RAM_MAX_BYTES = int(float(os.environ.get("H4_MEMO_RAM_MB", "2048")) * 1024 * 1024)
+
+
+def _memo_dir():
+    path = os.environ.get("H4_MEMO_DIR", "")
+    if not path:
+        # Not ComfyUI's temp dir: that one is wiped on startup, and this tier must survive restarts.
+        try:
+            import folder_paths
+            base = folder_paths.get_user_directory()
+        except Exception:
+            base = os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "h4_memo")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def fingerprint_payload(payload, user_key=""):
+    """
+    Hashes a payload by content (tensor bytes + dtype + shape, nested dicts/lists, scalars).
+    Returns (hex digest, persistable). Opaque objects (models...) are hashed by
+    identity, which is only valid in this process, so they are not persistable.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"key:{user_key}".encode("utf-8"))
+    persistable = True
+
+    def walk(obj):
+        nonlocal persistable
+        if torch.is_tensor(obj):
+            t = obj.detach().to("cpu").contiguous()
+            h.update(f"T{t.dtype}{tuple(t.shape)}".encode("utf-8"))
+            if t.numel():
+                h.update(memoryview(t.reshape(-1).view(torch.uint8).numpy()))
+        elif obj is None or isinstance(obj, (bool, int, float, str)):
+            h.update(f"V{type(obj).__name__}:{obj!r}".encode("utf-8"))
+        elif isinstance(obj, dict):
+            h.update(f"D{len(obj)}".encode("utf-8"))
+            for k in sorted(obj, key=str):
+                h.update(f"K{k!r}".encode("utf-8"))
+                walk(obj[k])
+        elif isinstance(obj, (list, tuple)):
+            h.update(f"L{len(obj)}".encode("utf-8"))
+            for v in obj:
+                walk(v)
+        else:
+            h.update(f"O{type(obj).__name__}:{id(obj)}".encode("utf-8"))
+            persistable = False
+
+    walk(payload)
+    return h.hexdigest(), persistable
+
+
+def _ram_get(fp):
+    with _RAM_LOCK:
+        hit = _RAM.get(fp)
+        if hit is None:
+            return None
+        _RAM.move_to_end(fp)
+    payload, _, devices = hit
+    # Back to where each tensor came from (traversal order is stable). For CPU
+    # targets .to() would hand out the cached tensor itself; copy so in-place edits
+    # downstream can't corrupt the entry.
+    steps = iter(devices)
+
+    def restore(t, key):
+        device = next(steps)
+        return t.to(device, copy=(device.type == "cpu"))
+
+    return map_tensors(payload, restore)
+
+
+def _ram_put(fp, payload):
+    nbytes = payload_nbytes(payload)
+    if _RAM_MAX_BYTES and nbytes > _RAM_MAX_BYTES:
+        return
+    # The "RAM" tier really is RAM: cached GPU tensors would pin VRAM outside
+    # ComfyUI's memory management.
+    devices = []
+
+    def to_cpu(t, key):
+        devices.append(t.device)
+        return t.detach().to("cpu")
+
+    stored = map_tensors(payload, to_cpu)
+    with _RAM_LOCK:
+        _RAM[fp] = (stored, nbytes, devices)
+        _RAM.move_to_end(fp)
+        total = sum(entry[1] for entry in _RAM.values())
+        while _RAM_MAX_BYTES and total > _RAM_MAX_BYTES and len(_RAM) > 1:
+            _, (_, freed, _) = _RAM.popitem(last=False)
+            total -= freed
+
+
+def memo_lookup(fp, tiers):
+    """Returns (payload, tier) or (None, None)."""
+    if tiers == "Bypass":
+        return None, None
+    payload = _ram_get(fp)
+    if payload is not None:
+        return payload, "RAM"
+    if tiers == "RAM + Disk":
+        path = os.path.join(_memo_dir(), f"{fp}.safetensors")
+        if os.path.isfile(path):
+            try:
+                payload = load_payload(path)
+            except Exception as e:
+                _log("⚠️ MEMO DISK READ FAILED | %s | %s", fp[:12], e)
+                return None, None
+            _ram_put(fp, payload)
+            return payload, "Disk"
+    return None, None
+
+
+def memo_store(fp, payload, tiers, persistable, user_key=""):
+    if tiers == "Bypass":
+        return
+    _ram_put(fp, payload)
+    if tiers == "RAM + Disk" and persistable and is_spillable(payload):
+        path = os.path.join(_memo_dir(), f"{fp}.safetensors")
+        try:
+            size = save_payload(path, payload, metadata={"user_key": user_key})
+            _log("💾 MEMO STORED | %s | %.1f MB -> %s", fp[:12], size / 1048576, path)
+        except Exception as e:
+            _log("⚠️ MEMO DISK WRITE FAILED | %s | %s", fp[:12], e)
+
+
+def clear_memo(disk=False):
+    with _RAM_LOCK:
+        _RAM.clear()
+    if disk:
+        folder = _memo_dir()
+        for name in os.listdir(folder):
+            if name.endswith(".safetensors"):
+                try:
+                    os.remove(os.path.join(folder, name))
+                except OSError:
+                    pass
+    _log("🧹 MEMO CLEARED | RAM%s", " + Disk" if disk else "")
+
+
+class H4_Memo:
+    """
+    🧠 H4 Memo (Result Cache)
+    Remembers what an expensive branch produced for a given input, and
+    skips that branch entirely the next time the same input shows up.
+    """
+
+    def __init__(self):
+        self._last = None  # (key_source, user_key, fingerprint, persistable)
+        self._hit = None   # (fingerprint, payload, tier) found during check_lazy_status
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "key_source": (ANY_TYPE, {"tooltip": "The INPUT of the expensive step (image, latent, prompt text...). Its content is the cache key."}),
+                "compute": (ANY_TYPE, {"lazy": True, "tooltip": "The RESULT of the expensive step. Only computed on a cache miss."}),
+                "user_key": ("STRING", {
+                    "default": "",
+                    "multiline": False,
+                    "tooltip": "Extra key text (e.g. 'upscale x2 ultrasharp'). Change it to invalidate old results."
+                }),
+                "tiers": (TIERS, {
+                    "default": "RAM + Disk",
+                    "tooltip": "RAM + Disk: survives restarts. RAM Only: this session. Bypass: always compute."
+                }),
+            }
+        }
+
+    RETURN_TYPES = (ANY_TYPE, "BOOLEAN", "STRING")
+    RETURN_NAMES = ("result", "cache_hit", "fingerprint")
+    FUNCTION = "memo"
+    CATEGORY = "h4_Live/Logic"
+
+    DESCRIPTION = """
+    🧠 **H4 Memo (Result Cache)**
+
+    "This won't change, reuse it."
+
+    **Usage:**
+    1. `key_source`: What goes INTO the slow step (e.g. the image before the upscaler).
+    2. `compute`: What comes OUT of the slow step (the upscaled image).
+    3. Use `result` downstream instead of the slow step's output.
+
+    Same input + same `user_key` = instant result, and the slow step is skipped.
+    """
+
+    def _fingerprint(self, key_source, user_key):
+        # check_lazy_status and memo see the same objects in one run; hash once.
+        # Holding the object itself (not its id) means a new object can never alias an old hash.
+        if self._last and self._last[0] is key_source and self._last[1] == user_key:
+            return self._last[2], self._last[3]
+        fp, persistable = fingerprint_payload(key_source, user_key)
+        self._last = (key_source, user_key, fp, persistable)
+        return fp, persistable
+
+    def check_lazy_status(self, key_source=None, compute=None, user_key="", tiers="RAM + Disk", **kwargs):
+        if compute is not None:
+            return []
+        fp, _ = self._fingerprint(key_source, user_key)
+        payload, tier = memo_lookup(fp, tiers)
+        if payload is None:
+            self._hit = None
+            return ["compute"]
+        # Keep the hit so an eviction before memo() can't turn it into a miss.
+        self._hit = (fp, payload, tier)
+        return []
+
+    def memo(self, key_source, user_key, tiers, compute=None):
+        node_id = "Memo"
+        fp, persistable = self._fingerprint(key_source, user_key)
+
+        if compute is None:
+            hit, self._hit = self._hit, None
+            payload, tier = (hit[1], hit[2]) if hit and hit[0] == fp else memo_lookup(fp, tiers)
+            if payload is not None:
+                _log("[%s] ⚡ HIT (%s) | %s", node_id, tier, fp[:12])
+                return (payload, True, fp)
+            raise ValueError(f"[{node_id}] Cache miss and 'compute' produced nothing. Is the expensive branch connected?")
+
+        _log("[%s] 🐢 MISS | %s | Storing result", node_id, fp[:12])
+        memo_store(fp, compute, tiers, persistable, user_key)
+        return (compute, False, fp)
@@ -0,0 +1,168 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_metrics.py
+# ------------------------------------------------------------------------------
+# H4 Node Profiler (Opt-In)
+# Rule 11 (Logging): Numbers, not vibes. Where does the time go?
+# Rule 21 (Debug Review): Per-node call count, wall / CPU time, tensor bytes.
+#
+# Enable with H4_METRICS=1. Every FUNCTION in NODE_CLASS_MAPPINGS is wrapped once
+# at load time; served as Prometheus text or JSON at GET /h4/metrics.
+# ------------------------------------------------------------------------------
+import functools
+import os
+import threading
+import time
+
+from server import PromptServer
+from aiohttp import web
+
+from .h4_core import _log, payload_nbytes
+
+# Wall-time histogram buckets (seconds), Prometheus style (+Inf is implicit).
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_METRICS = {}
+_LOCK = threading.Lock()
+
+
+def metrics_enabled():
+    return os.environ.get("H4_METRICS", "0") not in ("0", "false", "False", "")
+
+
+def _new_record():
+    return {
+        "calls": 0,
+        "errors": 0,
+        "wall_seconds": 0.0,
+        "cpu_seconds": 0.0,
+        "wall_max": 0.0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "buckets": [0] * len(BUCKETS),
+    }
+
+
+def _result_payload(result):
+    # Nodes may return {"ui": ..., "result": (...)} instead of a bare tuple.
+    if isinstance(result, dict) and "result" in result:
+        return result["result"]
+    return result
+
+
+def record_call(node_type, wall, cpu, bytes_in, bytes_out, failed=False):
+    with _LOCK:
+        rec = _METRICS.get(node_type)
+        if rec is None:
+            rec = _METRICS[node_type] = _new_record()
+        rec["calls"] += 1
+        rec["errors"] += 1 if failed else 0
+        rec["wall_seconds"] += wall
+        rec["cpu_seconds"] += cpu
+        rec["wall_max"] = max(rec["wall_max"], wall)
+        rec["bytes_in"] += bytes_in
+        rec["bytes_out"] += bytes_out
+        for i, bound in enumerate(BUCKETS):
+            if wall <= bound:
+                rec["buckets"][i] += 1
+                break
+
+
+def _wrap(node_type, func):
+    @functools.wraps(func)
+    def instrumented(*args, **kwargs):
+        bytes_in = payload_nbytes(list(kwargs.values()))
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        failed = False
+        result = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            bytes_out = 0 if failed else payload_nbytes(_result_payload(result))
+            record_call(node_type, wall, cpu, bytes_in, bytes_out, failed)
+
+    instrumented._h4_instrumented = True
+    return instrumented
+
+
+def instrument_nodes(class_mappings):
+    """Wraps each node's FUNCTION method in place. Safe to call more than once."""
+    wrapped = 0
+    for node_type, cls in class_mappings.items():
+        func_name = getattr(cls, "FUNCTION", None)
+        func = getattr(cls, func_name, None) if func_name else None
+        if func is None or getattr(func, "_h4_instrumented", False):
+            continue
+        setattr(cls, func_name, _wrap(node_type, func))
+        wrapped += 1
+    _log("📊 METRICS ENABLED | Instrumented %s node types (GET /h4/metrics)", wrapped)
+    return wrapped
+
+
+def reset_metrics():
+    with _LOCK:
+        _METRICS.clear()
+
+
+def metrics_snapshot():
+    """JSON-friendly copy of every node's counters (buckets keyed by upper bound)."""
+    with _LOCK:
+        out = {}
+        for node_type, rec in _METRICS.items():
+            data = dict(rec)
+            data["wall_avg"] = rec["wall_seconds"] / rec["calls"] if rec["calls"] else 0.0
+            data["buckets"] = {str(b): c for b, c in zip(BUCKETS, rec["buckets"])}
+            out[node_type] = data
+        return out
+
+
+def render_prometheus():
+    """Prometheus text exposition format (version 0.0.4)."""
+    with _LOCK:
+        items = [(k, dict(v, buckets=list(v["buckets"]))) for k, v in sorted(_METRICS.items())]
+
+    lines = [
+        "# HELP h4_node_calls_total Node executions.",
+        "# TYPE h4_node_calls_total counter",
+    ]
+    lines += [f'h4_node_calls_total{{node="{k}"}} {v["calls"]}' for k, v in items]
+    lines += ["# HELP h4_node_errors_total Node executions that raised.", "# TYPE h4_node_errors_total counter"]
+    lines += [f'h4_node_errors_total{{node="{k}"}} {v["errors"]}' for k, v in items]
+    lines += ["# HELP h4_node_cpu_seconds_total CPU time on the executing thread.", "# TYPE h4_node_cpu_seconds_total counter"]
+    lines += [f'h4_node_cpu_seconds_total{{node="{k}"}} {v["cpu_seconds"]:.6f}' for k, v in items]
+    lines += ["# HELP h4_node_bytes_in_total Tensor bytes passed into nodes.", "# TYPE h4_node_bytes_in_total counter"]
+    lines += [f'h4_node_bytes_in_total{{node="{k}"}} {v["bytes_in"]}' for k, v in items]
+    lines += ["# HELP h4_node_bytes_out_total Tensor bytes returned by nodes.", "# TYPE h4_node_bytes_out_total counter"]
+    lines += [f'h4_node_bytes_out_total{{node="{k}"}} {v["bytes_out"]}' for k, v in items]
+    lines += ["# HELP h4_node_wall_seconds Wall time per execution.", "# TYPE h4_node_wall_seconds histogram"]
+    for k, v in items:
+        cumulative = 0
+        for bound, count in zip(BUCKETS, v["buckets"]):
+            cumulative += count
+            lines.append(f'h4_node_wall_seconds_bucket{{node="{k}",le="{bound}"}} {cumulative}')
+        lines.append(f'h4_node_wall_seconds_bucket{{node="{k}",le="+Inf"}} {v["calls"]}')
+        lines.append(f'h4_node_wall_seconds_sum{{node="{k}"}} {v["wall_seconds"]:.6f}')
+        lines.append(f'h4_node_wall_seconds_count{{node="{k}"}} {v["calls"]}')
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------------------------------
+# Web API Endpoints
+# ------------------------------------------------------------------------------
+@PromptServer.instance.routes.get("/h4/metrics")
+async def h4_get_metrics(request):
+    """Per-node profiler output. Prometheus text by default, JSON with ?format=json."""
+    if request.rel_url.query.get("format") == "json":
+        return web.json_response({"enabled": metrics_enabled(), "nodes": metrics_snapshot()})
+    return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+
+@PromptServer.instance.routes.post("/h4/metrics/reset")
+async def h4_reset_metrics(request):
+    reset_metrics()
+    return web.json_response({"reset": True})
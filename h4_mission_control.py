@@ -5,8 +5,8 @@
 # Rule 11 (Logging): Debug modes and value tracking.
 # Rule 21 (Debug Review): Input validation and type safety.
 # ------------------------------------------------------------------------------
-from .h4_core import get_state, _log, increment_loop, reset_state, orbit_get, orbit_set
-from .h4_utils import ANY_TYPE
+from .h4_core import get_state, get_state_snapshot, _log, increment_loop, reset_state, consume_reset_flag, state_fingerprint
+from .h4_utils import ANY_TYPE, LOOP_NAME_INPUT
 import random
 
 class H4_MissionControl:
@@ -43,6 +43,7 @@ class H4_MissionControl:
                 "scheduler_val": ("FLOAT", {"forceInput": True, "tooltip": "Connect a Signal Generator (Float) here."}),
                 "scheduler_seed": ("INT", {"forceInput": True, "tooltip": "Connect a Seed Generator (Int) here."}),
                 "trigger_in": (ANY_TYPE, {"tooltip": "Daisy chain trigger (Optional)."}),
+                "loop_name": LOOP_NAME_INPUT,
             }
         }
 
@@ -65,44 +66,46 @@ class H4_MissionControl:
     CATEGORY = "h4_Live/MissionControl"
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        # Always update in Active Mode to ensure loop runs
-        if kwargs.get("mode") == "Active (Master Base)":
-            return float("nan")
-        return float("nan")
+    def IS_CHANGED(cls, mode=None, wireless_reset=False, loop_name=None, **kwargs):
+        # Active Mode increments every run: its own write invalidates it for the next one.
+        if mode == "Active (Master Base)":
+            keys = ("request_reset",) if wireless_reset else ()
+            return state_fingerprint(loop_name, orbit_keys=keys, include_touch=True)
+        # Passive Mode only displays the count.
+        return state_fingerprint(loop_name)
 
-    def process_mission(self, mode, wireless_reset, debug_mode, scheduler_val=None, scheduler_seed=None, trigger_in=None):
+    def process_mission(self, mode, wireless_reset, debug_mode, scheduler_val=None, scheduler_seed=None, trigger_in=None, loop_name=None):
         node_id = "MissionControl"
         
         # --- ACTIVE MODE LOGIC ---
         if mode == "Active (Master Base)":
             # 1. Check Wireless Reset
             if wireless_reset:
-                reset_flag = orbit_get("request_reset")
-                if reset_flag is True:
-                    _log(f"[{node_id}] 📡 Wireless Reset Signal Detected!")
-                    reset_state()
-                    orbit_set("request_reset", False)
+                if consume_reset_flag(loop_name):
+                    _log("[%s] 📡 Wireless Reset Signal Detected!", node_id)
+                    reset_state(loop_name)
             
             # 2. Increment Loop
-            increment_loop()
+            increment_loop(loop_name)
             
         # --- STATS REPORTING ---
-        state = get_state()
+        state = get_state_snapshot(loop_name)
         count = state["loop_count"]
         
         # 1. Log Stats
         if debug_mode:
-            _log(f"[{node_id}] ----------------------------------------")
-            _log(f"[{node_id}] 🛸 MISSION STATUS | RUN: {count}")
-            _log(f"[{node_id}] Mode: {mode}")
-            _log(f"[{node_id}] Sched Val: {scheduler_val}")
-            _log(f"[{node_id}] Sched Seed: {scheduler_seed}")
-            _log(f"[{node_id}] ----------------------------------------")
+            _log("[%s] ----------------------------------------", node_id)
+            _log("[%s] 🛸 MISSION STATUS | RUN: %s", node_id, count)
+            _log("[%s] Mode: %s", node_id, mode)
+            _log("[%s] Loop: %s", node_id, loop_name)
+            _log("[%s] Sched Val: %s", node_id, scheduler_val)
+            _log("[%s] Sched Seed: %s", node_id, scheduler_seed)
+            _log("[%s] ----------------------------------------", node_id)
 
         # 2. Build UI String
         ui_report = f"🛸 H4 MISSION CONTROL\n"
         ui_report += f"Mode: {mode}\n"
+        ui_report += f"Loop: {loop_name}\n"
         ui_report += f"Run Count: {count}\n"
         ui_report += f"Scheduler Value: {scheduler_val}\n"
         ui_report += f"Current Seed: {scheduler_seed}\n"
@@ -137,6 +140,9 @@ class H4_LinearScheduler:
                     "default": 16, "min": 1, "max": 10000, 
                     "tooltip": "The total number of loops you plan to run."
                 }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
             }
         }
 
@@ -154,11 +160,14 @@ class H4_LinearScheduler:
     CATEGORY = "h4_Live/MissionControl"
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        return float("nan")
-
-    def calculate_linear(self, start_val, end_val, max_loops):
-        state = get_state()
+    def IS_CHANGED(cls, max_loops=None, loop_name=None, **kwargs):
+        # Past max_loops the output is pinned to end_val, so stop invalidating.
+        if isinstance(max_loops, int) and get_state(loop_name)["loop_count"] >= max(1, max_loops):
+            return "clamped"
+        return state_fingerprint(loop_name)
+
+    def calculate_linear(self, start_val, end_val, max_loops, loop_name=None):
+        state = get_state(loop_name)
         count = state["loop_count"]
         
         # Safety: Prevent division by zero
@@ -197,6 +206,9 @@ class H4_SeedGenerator:
                     "default": "Incremental",
                     "tooltip": "Incremental: Start + Loop Count. Fixed: Always Start. Random: Pure Chaos."
                 }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
             }
         }
 
@@ -216,14 +228,16 @@ class H4_SeedGenerator:
     CATEGORY = "h4_Live/MissionControl"
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        # Force update for Random mode
-        if kwargs.get("mode") == "Random":
+    def IS_CHANGED(cls, mode=None, loop_name=None, **kwargs):
+        # Random must roll every run; Fixed never depends on the loop.
+        if mode == "Random":
             return float("nan")
-        return float("nan")
+        if mode == "Fixed":
+            return "fixed"
+        return state_fingerprint(loop_name)
 
-    def generate_seed(self, start_seed, mode):
-        state = get_state()
+    def generate_seed(self, start_seed, mode, loop_name=None):
+        state = get_state(loop_name)
         count = state["loop_count"]
         
         if mode == "Fixed":
@@ -0,0 +1,180 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_pipe.py
+# ------------------------------------------------------------------------------
+# H4_PIPE (Immutable, Structurally Shared)
+# Rule 3 (Modular Architecture): One pipe type for every Context node.
+# Rule 20 (Clairvoyant Development): Extending a pipe stores ONLY the changed
+# keys and points at its parent, so a chain of N hubs costs O(changed keys)
+# per hop instead of a full dict copy. Every field carries a version number,
+# so "did this key change?" is an int compare, not a tensor compare.
+# ------------------------------------------------------------------------------
+import itertools
+from collections.abc import Mapping
+
+# Process-wide version source: a new number every time a key gets a new value.
+_VERSIONS = itertools.count(1)
+
+
+class PipeThunk:
+    """
+    Deferred pipe value. fn() runs on first read and the result is kept,
+    so a field is materialized at most once and only if someone reads it.
+    """
+    __slots__ = ("_fn", "_value", "_done")
+
+    def __init__(self, fn):
+        self._fn = fn
+        self._value = None
+        self._done = False
+
+    @property
+    def ready(self):
+        return self._done
+
+    def resolve(self):
+        if not self._done:
+            self._value = self._fn()
+            self._done = True
+            self._fn = None
+        return self._value
+
+
+class _PipeField:
+    """One key's value + the version it was set at."""
+    __slots__ = ("value", "version")
+
+    def __init__(self, value, version):
+        self.value = value
+        self.version = version
+
+
+class H4Pipe(Mapping):
+    """
+    Read-only mapping. Use extend() / set() to get a new pipe; the old one is
+    never modified, so every node downstream can keep its own reference safely.
+    """
+    __slots__ = ("_parent", "_fields", "_len", "_depth")
+
+    # After this many layers the chain is flattened once (amortised O(1) per hop).
+    MAX_DEPTH = 16
+
+    def __init__(self, fields=None, parent=None):
+        self._parent = parent
+        self._fields = fields or {}
+        if parent is None:
+            self._len = len(self._fields)
+            self._depth = 0
+        else:
+            self._len = len(parent) + sum(1 for k in self._fields if parent._field(k) is None)
+            self._depth = parent._depth + 1
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Wraps a plain dict (legacy pipes) or returns an H4Pipe unchanged."""
+        if isinstance(mapping, H4Pipe):
+            return mapping
+        return cls().extend(mapping or {})
+
+    def _field(self, key):
+        node = self
+        while node is not None:
+            field = node._fields.get(key)
+            if field is not None:
+                return field
+            node = node._parent
+        return None
+
+    def _flat_fields(self):
+        layers = []
+        node = self
+        while node is not None:
+            layers.append(node._fields)
+            node = node._parent
+        flat = {}
+        for fields in reversed(layers):
+            flat.update(fields)
+        return flat
+
+    # --- Mapping protocol ---
+    def __getitem__(self, key):
+        field = self._field(key)
+        if field is None:
+            raise KeyError(key)
+        if isinstance(field.value, PipeThunk):
+            return field.value.resolve()
+        return field.value
+
+    def __iter__(self):
+        return iter(self._flat_fields())
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, key):
+        return self._field(key) is not None
+
+    def __eq__(self, other):
+        # Versions are unique per assignment: equal versions => identical values (no tensor compares).
+        if isinstance(other, H4Pipe):
+            return self is other or self.versions() == other.versions()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.fingerprint())
+
+    def __repr__(self):
+        return f"H4Pipe(keys={list(self)}, depth={self._depth})"
+
+    # --- Building ---
+    def extend(self, changes=None, **kwargs):
+        """
+        New pipe with the given keys set. Values identical (is) to the current ones keep their version.
+        A PipeThunk value makes the key lazy: it is only computed when read.
+        """
+        updates = dict(changes or {}, **kwargs)
+        new_fields = {}
+        for key, value in updates.items():
+            current = self._field(key)
+            if current is not None and current.value is value:
+                continue
+            new_fields[key] = _PipeField(value, next(_VERSIONS))
+        if not new_fields:
+            return self
+        pipe = H4Pipe(new_fields, self)
+        if pipe._depth > self.MAX_DEPTH:
+            # Field records are shared, not copied.
+            pipe = H4Pipe(pipe._flat_fields())
+        return pipe
+
+    set = extend
+
+    def copy(self):
+        """Immutable: a 'copy' is the same pipe (kept for old dict-style callers)."""
+        return self
+
+    def to_dict(self):
+        """Plain dict of every key (materializes lazy fields)."""
+        return {k: self[k] for k in self._flat_fields()}
+
+    def is_materialized(self, key):
+        """False only for a lazy field that nobody has read yet."""
+        field = self._field(key)
+        return field is not None and (not isinstance(field.value, PipeThunk) or field.value.ready)
+
+    def peek(self, key, default=None):
+        """Like get(), but never triggers a lazy field (returns default instead)."""
+        return self[key] if self.is_materialized(key) else default
+
+    # --- Change detection ---
+    def version(self, key):
+        """Version of one key (0 if missing). Changes only when the key gets a new value."""
+        field = self._field(key)
+        return field.version if field is not None else 0
+
+    def versions(self):
+        return {k: f.version for k, f in self._flat_fields().items()}
+
+    def fingerprint(self, keys=None):
+        """Short string that changes iff one of the (selected) keys changed. Handy for IS_CHANGED."""
+        if keys is None:
+            keys = sorted(self._flat_fields())
+        return "|".join(f"{k}:{self.version(k)}" for k in keys)
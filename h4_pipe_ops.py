@@ -0,0 +1,341 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_pipe_ops.py
+# ------------------------------------------------------------------------------
+# H4_PIPE Operations (Whole-Context Tools)
+# Rule 3 (Modular Architecture): Works on any H4_PIPE; fields stay untouched
+# apart from where their tensors live.
+# Rule 20 (Clairvoyant Development): One pass over every tensor leaf in the
+# pipe (images, masks, latent dicts, conditioning lists). All copies are
+# queued non-blocking and the stream is synchronized ONCE at the end, instead
+# of one blocking copy per field.
+# Saved pipes are one safetensors file + a JSON manifest. Loading reads only
+# the manifest; each field is a lazy thunk over the memory-mapped file.
+# ------------------------------------------------------------------------------
+import json
+import os
+import time
+
+import torch
+
+from .h4_core import _log
+from .h4_pipe import H4Pipe, PipeThunk
+from .h4_tensor_io import map_tensors, save_payload, is_spillable, unflatten_payload, _STRUCT_KEY
+
+PIPE_FORMAT = "h4_pipe/1"
+
+try:
+    import comfy.model_management as model_management
+except ImportError:
+    model_management = None
+
+TARGETS = ["GPU (Compute Device)", "CPU (Pinned)", "CPU"]
+
+
+def _compute_device():
+    if model_management is not None:
+        return model_management.get_torch_device()
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+class _Mover:
+    """Moves tensors to one target. Shared tensors are moved once and stay shared."""
+
+    def __init__(self, target):
+        self.pinned = target == "CPU (Pinned)" and torch.cuda.is_available()
+        self.device = _compute_device() if target == "GPU (Compute Device)" else torch.device("cpu")
+        self.moved = {}  # id(src) -> (src, dst); src is kept so its id can't be reused mid-pass
+        self.bytes_moved = 0
+        self.tensors_moved = 0
+        self.swaps = 0  # Leaves replaced, including repeats of an already moved tensor.
+        self.sync_devices = set()
+
+    def _needs_move(self, t):
+        if t.device.type != self.device.type:
+            return True
+        if self.device.type == "cpu":
+            return self.pinned and not t.is_pinned()
+        return self.device.index is not None and t.device.index != self.device.index
+
+    def __call__(self, t, key=None):
+        hit = self.moved.get(id(t))
+        if hit is not None:
+            self.swaps += 1
+            return hit[1]
+        if not self._needs_move(t):
+            return t
+        if self.device.type == "cpu":
+            dst = torch.empty(t.shape, dtype=t.dtype, device="cpu", pin_memory=self.pinned)
+            # Into pinned memory a D2H copy is truly async; the CPU must wait before reading it.
+            dst.copy_(t.detach(), non_blocking=self.pinned)
+            if t.is_cuda and self.pinned:
+                self.sync_devices.add(t.device)
+        else:
+            # Async only from pinned sources; pageable memory silently falls back to a sync copy.
+            dst = t.detach().to(self.device, non_blocking=True)
+        self.moved[id(t)] = (t, dst)
+        self.bytes_moved += t.element_size() * t.nelement()
+        self.tensors_moved += 1
+        self.swaps += 1
+        return dst
+
+    def finish(self):
+        for device in self.sync_devices:
+            torch.cuda.current_stream(device).synchronize()
+
+
+def migrate_pipe(pipe, target):
+    """
+    Returns (new pipe, mover) with every tensor leaf on the target.
+    Lazy fields that were never read stay lazy; they migrate when first read.
+    Models / VAE / CLIP objects are left alone (ComfyUI's model management owns them).
+    """
+    pipe = H4Pipe.from_mapping(pipe)
+    mover = _Mover(target)
+    changes = {}
+    for key in pipe:
+        if not pipe.is_materialized(key):
+            changes[key] = PipeThunk(lambda key=key: migrate_payload(pipe[key], target))
+            continue
+        before = mover.swaps
+        moved = map_tensors(pipe[key], mover)
+        # Fields without tensors (or already in place) keep their object and version.
+        if mover.swaps > before:
+            changes[key] = moved
+    mover.finish()
+    return pipe.extend(changes), mover
+
+
+def migrate_payload(payload, target):
+    mover = _Mover(target)
+    moved = map_tensors(payload, mover)
+    mover.finish()
+    return moved if mover.tensors_moved else payload
+
+
+class H4_PipeResidency:
+    """
+    🚚 H4 Pipe Residency (Bulk Move)
+    Moves every tensor in an H4_PIPE to the GPU, pinned CPU or plain CPU in
+    one batched pass and reports how much data moved.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "h4_pipe": ("H4_PIPE",),
+                "target": (TARGETS, {
+                    "default": "CPU (Pinned)",
+                    "tooltip": "GPU: bring the context back for sampling. CPU (Pinned): park it off-GPU, fast to bring back. CPU: plain RAM."
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("H4_PIPE", "INT", "STRING")
+    RETURN_NAMES = ("h4_pipe", "bytes_moved", "report")
+    FUNCTION = "migrate"
+    CATEGORY = "h4_Live"
+
+    DESCRIPTION = """
+    🚚 **H4 Pipe Residency (Bulk Move)**
+
+    Parks a whole context off the GPU between loop phases, then brings
+    it back in one shot.
+
+    **Moves:** Images, masks, latents, conditioning tensors.
+    **Leaves alone:** Model / VAE / CLIP (ComfyUI manages those).
+    """
+
+    def migrate(self, h4_pipe, target):
+        node_id = "PipeResidency"
+        new_pipe, mover = migrate_pipe(h4_pipe, target)
+        report = f"{mover.tensors_moved} tensor(s) | {mover.bytes_moved / 1048576:.1f} MB -> {mover.device}{' (pinned)' if mover.pinned else ''}"
+        _log("[%s] 🚚 %s", node_id, report)
+        return (new_pipe, mover.bytes_moved, report)
+
+
+# ------------------------------------------------------------------------------
+# Save / Load
+# ------------------------------------------------------------------------------
+def _pipe_root():
+    path = os.environ.get("H4_PIPE_DIR", "")
+    if not path:
+        try:
+            import folder_paths
+            base = folder_paths.get_output_directory()
+        except Exception:
+            base = os.path.expanduser("~")
+        path = os.path.join(base, "h4_pipes")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _safe_name(name):
+    cleaned = "".join(c for c in str(name).strip() if c.isalnum() or c in "-_.")
+    return cleaned or "h4_pipe"
+
+
+def pipe_paths(name):
+    """(<root>/<name>.safetensors, <root>/<name>.json)"""
+    base = os.path.join(_pipe_root(), _safe_name(name))
+    return f"{base}.safetensors", f"{base}.json"
+
+
+def _describe(payload):
+    """Manifest summary of a field: shapes + dtypes of its tensors, plain values as-is."""
+    if torch.is_tensor(payload):
+        return {"shape": list(payload.shape), "dtype": str(payload.dtype).replace("torch.", "")}
+    if isinstance(payload, dict):
+        return {k: _describe(v) for k, v in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [_describe(v) for v in payload]
+    return payload
+
+
+def save_pipe(pipe, name):
+    """
+    Writes every spillable field to one safetensors file (the structure record
+    lives in its header), then the JSON manifest. Returns (tensor path, manifest).
+    Fields holding models / VAE / CLIP, or skipped lazy fields, are listed as 'skipped'.
+    """
+    pipe = H4Pipe.from_mapping(pipe)
+    tensor_path, manifest_path = pipe_paths(name)
+
+    fields, skipped = {}, {}
+    for key in pipe:
+        try:
+            value = pipe[key]
+        except Exception as e:
+            skipped[key] = str(e)
+            continue
+        if not is_spillable(value):
+            skipped[key] = f"{type(value).__name__} cannot be saved"
+            continue
+        fields[key] = value
+
+    size = save_payload(tensor_path, fields, metadata={"format": PIPE_FORMAT})
+    manifest = {
+        "format": PIPE_FORMAT,
+        "created": time.time(),
+        "tensor_file": os.path.basename(tensor_path),
+        "bytes": size,
+        "fields": {key: _describe(value) for key, value in fields.items()},
+        "skipped": skipped,
+    }
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return tensor_path, manifest
+
+
+def _field_loader(tensor_path, structure):
+    def load():
+        from safetensors import safe_open
+
+        # safe_open memory-maps the file: only this field's tensors are paged in.
+        with safe_open(tensor_path, framework="pt", device="cpu") as handle:
+            return unflatten_payload(structure, handle.get_tensor)
+    return load
+
+
+def load_pipe(name, base_pipe=None):
+    """
+    Opens a saved pipe without reading any tensor data: the structure comes
+    from the safetensors header, every field becomes a PipeThunk layered on
+    top of base_pipe. Returns (pipe, loaded keys, manifest).
+    """
+    from safetensors import safe_open
+
+    tensor_path, manifest_path = pipe_paths(name)
+    if not os.path.isfile(manifest_path) or not os.path.isfile(tensor_path):
+        raise FileNotFoundError(f"No saved pipe named '{name}' in {_pipe_root()}")
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != PIPE_FORMAT:
+        raise ValueError(f"'{name}' is not an {PIPE_FORMAT} file (format: {manifest.get('format')}).")
+
+    with safe_open(tensor_path, framework="pt", device="cpu") as handle:
+        structure = json.loads((handle.metadata() or {})[_STRUCT_KEY])
+    fields = {key: PipeThunk(_field_loader(tensor_path, record)) for key, record in structure.get("__d__", [])}
+    return H4Pipe.from_mapping(base_pipe).extend(fields), list(fields), manifest
+
+
+class H4_PipeSave:
+    """
+    💾 H4 Pipe Save (Disk)
+    Writes an H4_PIPE to <output>/h4_pipes/<name>.safetensors + <name>.json.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "h4_pipe": ("H4_PIPE",),
+                "name": ("STRING", {"default": "h4_pipe", "multiline": False, "tooltip": "File name (no extension). Same name = overwrite."}),
+            }
+        }
+
+    RETURN_TYPES = ("H4_PIPE", "STRING")
+    RETURN_NAMES = ("h4_pipe", "path")
+    FUNCTION = "save"
+    CATEGORY = "h4_Live"
+    OUTPUT_NODE = True
+
+    DESCRIPTION = """
+    💾 **H4 Pipe Save (Disk)**
+
+    Saves conditionings, latents, masks, images and plain values of a
+    context so it never has to be rebuilt (after a restart, or on another machine).
+
+    Models / VAE / CLIP are not saved; reconnect them with a Context Hub after loading.
+    """
+
+    def save(self, h4_pipe, name):
+        node_id = "PipeSave"
+        tensor_path, manifest = save_pipe(h4_pipe, name)
+        _log("[%s] 💾 PIPE SAVED | '%s' | Fields: %s | %.1f MB -> %s", node_id, name, list(manifest["fields"]), manifest["bytes"] / 1048576, tensor_path)
+        if manifest["skipped"]:
+            _log("[%s] ⚠️ Not saved: %s", node_id, ", ".join(manifest["skipped"]))
+        return (h4_pipe, tensor_path)
+
+
+class H4_PipeLoad:
+    """
+    📂 H4 Pipe Load (Memory-Mapped)
+    Opens a saved H4_PIPE instantly; each field is read from disk only when used.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "name": ("STRING", {"default": "h4_pipe", "multiline": False, "tooltip": "Name used in H4 Pipe Save."}),
+            },
+            "optional": {
+                "base_pipe": ("H4_PIPE", {"tooltip": "Loaded fields are layered on top of this pipe (e.g. one holding the models)."}),
+            }
+        }
+
+    RETURN_TYPES = ("H4_PIPE", "STRING")
+    RETURN_NAMES = ("h4_pipe", "fields")
+    FUNCTION = "load"
+    CATEGORY = "h4_Live"
+
+    DESCRIPTION = """
+    📂 **H4 Pipe Load (Memory-Mapped)**
+
+    Opening is instant, even for GBs: only the manifest is read.
+    A field is paged in from disk the first time something uses it
+    (e.g. a connected Context Unpack output).
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, name, **kwargs):
+        tensor_path, manifest_path = pipe_paths(name)
+        return "|".join(str(os.path.getmtime(p)) if os.path.isfile(p) else "missing" for p in (tensor_path, manifest_path))
+
+    def load(self, name, base_pipe=None):
+        node_id = "PipeLoad"
+        pipe, keys, manifest = load_pipe(name, base_pipe)
+        _log("[%s] 📂 PIPE OPENED | '%s' | Fields: %s | %.1f MB on disk (lazy)", node_id, name, keys, manifest.get("bytes", 0) / 1048576)
+        return (pipe, ", ".join(keys))
@@ -0,0 +1,268 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_schedule.py
+# ------------------------------------------------------------------------------
+# H4 Schedule Compiler
+# Rule 1 (No Placeholders): Real curves, real tables.
+# Rule 20 (Clairvoyant Development): Every per-iteration parameter (denoise,
+# cfg, seeds...) is compiled ONCE into NumPy columns for the whole loop.
+# Each run is then an O(1) row lookup, and batch consumers can take a slice.
+# ------------------------------------------------------------------------------
+import json
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .h4_core import _log, get_state, state_fingerprint
+from .h4_utils import LOOP_NAME_INPUT
+
+SCHEDULE_TYPE = "H4_SCHEDULE"
+CURVES = ("linear", "ease_in", "ease_out", "cosine", "constant")
+SEED_MODES = ["Incremental", "Fixed", "Random (Seeded)"]
+OVERFLOW_MODES = ["Hold Last", "Wrap"]
+
+_RAMP_RE = re.compile(r"^\s*([-+]?[\d.eE+-]+)\s*->\s*([-+]?[\d.eE+-]+)\s*(?::\s*(\w+))?\s*$")
+
+
+def _curve(name, length):
+    """0..1 progress for each row (row 0 = start, last row = end)."""
+    t = np.linspace(0.0, 1.0, length) if length > 1 else np.zeros(1)
+    if name == "linear":
+        return t
+    if name == "ease_in":
+        return t * t
+    if name == "ease_out":
+        return 1.0 - (1.0 - t) ** 2
+    if name == "cosine":
+        return 0.5 - 0.5 * np.cos(np.pi * t)
+    if name == "constant":
+        return np.zeros_like(t)
+    raise ValueError(f"Unknown curve '{name}'. Use one of: {', '.join(CURVES)}")
+
+
+# Columns the compiler fills itself; a curve may not reuse these names.
+RESERVED_COLUMNS = ("seed",)
+
+
+def parse_curves(text, length):
+    """
+    One parameter per line:
+      denoise = 1.0 -> 0.45 : cosine     (ramp, curve optional, default linear)
+      cfg     = 7.0, 6.5, 6.0            (explicit rows, last value is held)
+    Blank lines and '#' comments are ignored. 'seed' is reserved (RESERVED_COLUMNS).
+    """
+    columns = OrderedDict()
+    for line_no, raw in enumerate(text.splitlines(), start=1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if "=" not in line:
+            raise ValueError(f"Line {line_no}: expected 'name = ...', got '{raw.strip()}'")
+        name, spec = (part.strip() for part in line.split("=", 1))
+        if not name:
+            raise ValueError(f"Line {line_no}: parameter name is empty")
+        if name in RESERVED_COLUMNS:
+            raise ValueError(f"Line {line_no}: '{name}' is reserved (set by the seed inputs), pick another name")
+
+        ramp = _RAMP_RE.match(spec)
+        if ramp:
+            start, end = float(ramp.group(1)), float(ramp.group(2))
+            columns[name] = start + (end - start) * _curve((ramp.group(3) or "linear").lower(), length)
+            continue
+
+        try:
+            values = [float(v) for v in spec.split(",") if v.strip()]
+        except ValueError:
+            raise ValueError(f"Line {line_no}: cannot read '{spec}' (use 'a -> b : curve' or 'v0, v1, ...')")
+        if not values:
+            raise ValueError(f"Line {line_no}: '{name}' has no values")
+        column = np.full(length, values[-1], dtype=np.float64)
+        n = min(len(values), length)
+        column[:n] = values[:n]
+        columns[name] = column
+    return columns
+
+
+def compile_seeds(start_seed, mode, length):
+    if mode == "Fixed":
+        return np.full(length, start_seed, dtype=np.uint64)
+    if mode == "Random (Seeded)":
+        # Reproducible "random": same start_seed -> same sequence every time.
+        return np.random.default_rng(start_seed).integers(0, 2**64, size=length, dtype=np.uint64, endpoint=False)
+    return (np.uint64(start_seed) + np.arange(length, dtype=np.uint64))  # wraps at 2^64
+
+
+class H4Schedule:
+    """Compiled, read-only parameter table. Columns are NumPy arrays of equal length."""
+
+    def __init__(self, length, columns, overflow="Hold Last"):
+        self.length = int(length)
+        self.columns = columns
+        self.overflow = overflow
+        for col in self.columns.values():
+            col.setflags(write=False)
+
+    def index(self, count):
+        if self.overflow == "Wrap":
+            return int(count) % self.length
+        return min(max(int(count), 0), self.length - 1)
+
+    def value(self, name, count):
+        if name not in self.columns:
+            raise KeyError(f"Schedule has no parameter '{name}'. Available: {list(self.columns)}")
+        return self.columns[name][self.index(count)].item()
+
+    def row(self, count):
+        i = self.index(count)
+        return {name: col[i].item() for name, col in self.columns.items()}
+
+    def slice(self, name, count, span):
+        """span rows starting at count (overflow rules applied per row)."""
+        idx = [self.index(c) for c in range(int(count), int(count) + int(span))]
+        return self.columns[name][idx]
+
+    def __repr__(self):
+        return f"H4Schedule(length={self.length}, params={list(self.columns)})"
+
+
+# Compiled tables are keyed by their spec, so re-runs with the same widgets never recompile.
+_COMPILED = OrderedDict()
+_COMPILED_LOCK = threading.Lock()
+_COMPILED_MAX = 16
+
+
+def compile_schedule(loop_length, curves, start_seed, seed_mode, overflow):
+    key = (loop_length, curves, start_seed, seed_mode, overflow)
+    with _COMPILED_LOCK:
+        if key in _COMPILED:
+            _COMPILED.move_to_end(key)
+            return _COMPILED[key]
+
+    columns = parse_curves(curves, loop_length)
+    columns["seed"] = compile_seeds(start_seed, seed_mode, loop_length)
+    schedule = H4Schedule(loop_length, columns, overflow)
+    _log("📅 SCHEDULE COMPILED | %s rows | Params: %s", loop_length, list(columns))
+
+    with _COMPILED_LOCK:
+        _COMPILED[key] = schedule
+        while len(_COMPILED) > _COMPILED_MAX:
+            _COMPILED.popitem(last=False)
+    return schedule
+
+
+class H4_ScheduleCompiler:
+    """
+    📅 H4 Schedule Compiler
+    Precomputes every per-iteration parameter into one table and emits the
+    row for the current loop count.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "loop_length": ("INT", {
+                    "default": 16, "min": 1, "max": 100000,
+                    "tooltip": "Rows in the table (one per loop run)."
+                }),
+                "curves": ("STRING", {
+                    "default": "denoise = 1.0, 0.45\ncfg = 7.0 -> 5.0 : cosine",
+                    "multiline": True,
+                    "tooltip": "One per line. 'name = start -> end : curve' (linear, ease_in, ease_out, cosine, constant) or 'name = v0, v1, ...' (last value held)."
+                }),
+                "start_seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff}),
+                "seed_mode": (SEED_MODES, {
+                    "default": "Incremental",
+                    "tooltip": "Incremental: start + row. Fixed: always start. Random (Seeded): repeatable random sequence from start."
+                }),
+                "overflow": (OVERFLOW_MODES, {
+                    "default": "Hold Last",
+                    "tooltip": "What happens after the last row: keep the last values, or start over."
+                }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+            }
+        }
+
+    RETURN_TYPES = (SCHEDULE_TYPE, "FLOAT", "INT", "INT", "STRING")
+    RETURN_NAMES = ("schedule", "denoise", "seed", "row_index", "row_json")
+    FUNCTION = "compile"
+    CATEGORY = "h4_Live/MissionControl"
+
+    DESCRIPTION = """
+    📅 **H4 Schedule Compiler**
+
+    One place for every value that changes per loop run.
+    Write the curves once, and each run reads its row from the table.
+
+    - `denoise` / `seed`: Shortcuts for the common ones (denoise = 1.0 if not defined).
+    - `schedule`: Connect to **H4 Schedule Read** for any other parameter or a slice of rows.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, loop_name=None, **kwargs):
+        return state_fingerprint(loop_name)
+
+    def compile(self, loop_length, curves, start_seed, seed_mode, overflow, loop_name=None):
+        node_id = "ScheduleCompiler"
+        try:
+            schedule = compile_schedule(loop_length, curves, start_seed, seed_mode, overflow)
+        except ValueError as e:
+            raise ValueError(f"[{node_id}] {e}")
+
+        count = get_state(loop_name)["loop_count"]
+        row = schedule.row(count)
+        denoise = float(row.get("denoise", 1.0))
+        return (schedule, denoise, int(row["seed"]), schedule.index(count), json.dumps(row))
+
+
+class H4_ScheduleRead:
+    """
+    📅 H4 Schedule Read
+    Pulls one parameter (or a span of rows) out of a compiled schedule.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "schedule": (SCHEDULE_TYPE,),
+                "param_name": ("STRING", {"default": "cfg", "multiline": False}),
+                "span": ("INT", {
+                    "default": 1, "min": 1, "max": 100000,
+                    "tooltip": "Rows to return in value_slice (starting at the current run)."
+                }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+            }
+        }
+
+    RETURN_TYPES = ("FLOAT", "INT", "FLOAT")
+    RETURN_NAMES = ("value", "value_int", "value_slice")
+    OUTPUT_IS_LIST = (False, False, True)
+    FUNCTION = "read"
+    CATEGORY = "h4_Live/MissionControl"
+
+    DESCRIPTION = """
+    📅 **H4 Schedule Read**
+
+    `value`: This run's value. `value_slice`: The next `span` values as a
+    list, for nodes that process several iterations in one batch.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, loop_name=None, **kwargs):
+        return state_fingerprint(loop_name)
+
+    def read(self, schedule, param_name, span, loop_name=None):
+        node_id = "ScheduleRead"
+        name = param_name.strip()
+        try:
+            count = get_state(loop_name)["loop_count"]
+            value = schedule.value(name, count)
+            values = schedule.slice(name, count, span).tolist()
+        except KeyError as e:
+            raise ValueError(f"[{node_id}] {e.args[0]}")
+        return (float(value), int(value), [float(v) for v in values])
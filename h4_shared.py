@@ -0,0 +1,137 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_shared.py
+# ------------------------------------------------------------------------------
+# Cross-Process Shared State (Optional Backend)
+# Rule 3 (Modular Architecture): h4_core keeps its API; this only moves bytes.
+# Rule 20 (Clairvoyant Development): Several ComfyUI workers on one machine
+# (one per GPU) can share loop counters, orbit flags and buffered tensors:
+#   - counters + flags: one multiprocessing.shared_memory segment (JSON, versioned)
+#   - tensors:          safetensors files in a RAM-backed dir, memory-mapped on read
+#   - locking:          an OS file lock (fcntl / msvcrt), so unrelated processes agree
+#
+# Enable with H4_SHARED_STATE=<group name> (same name in every worker).
+# Add H4_SHARED_BUFFER=1 to share the Universal Buffer as well.
+# ------------------------------------------------------------------------------
+import os
+import struct
+import tempfile
+import threading
+from multiprocessing import shared_memory
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# [version: uint64][length: uint32][JSON bytes ...]
+_HEADER = struct.Struct("<QI")
+
+
+def shared_group_name():
+    """Group name from H4_SHARED_STATE ('' = backend off)."""
+    raw = os.environ.get("H4_SHARED_STATE", "").strip()
+    return "".join(c for c in raw if c.isalnum() or c in "-_")
+
+
+def shared_buffer_enabled():
+    return os.environ.get("H4_SHARED_BUFFER", "0") not in ("0", "false", "False", "")
+
+
+def _untrack(shm):
+    # Python's resource tracker unlinks segments when the creating process exits,
+    # which would pull the rug out from the other workers. The group outlives any one of them.
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+class _FileLock:
+    """Exclusive inter-process lock on a small file (blocking)."""
+
+    def __init__(self, path):
+        self._fh = open(path, "a+b")
+
+    def acquire(self):
+        if os.name == "nt":
+            self._fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting.
+        fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+
+    def release(self):
+        if os.name == "nt":
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+
+
+class SharedSegment:
+    """
+    Versioned JSON blob in a named shared-memory segment.
+    Callers hold the lock (acquire/release) around read + write.
+    """
+
+    def __init__(self, group, size):
+        self.group = group
+        self.lock = _FileLock(os.path.join(tempfile.gettempdir(), f"h4_shared_{group}.lock"))
+        self.lock.acquire()
+        try:
+            try:
+                self.shm = shared_memory.SharedMemory(name=f"h4_{group}", create=True, size=size)
+                _HEADER.pack_into(self.shm.buf, 0, 0, 0)
+                self.created = True
+            except FileExistsError:
+                self.shm = shared_memory.SharedMemory(name=f"h4_{group}")
+                self.created = False
+        finally:
+            self.lock.release()
+        _untrack(self.shm)
+
+    @property
+    def capacity(self):
+        return self.shm.size - _HEADER.size
+
+    def version(self):
+        return _HEADER.unpack_from(self.shm.buf, 0)[0]
+
+    def read(self):
+        """Returns (version, bytes)."""
+        version, length = _HEADER.unpack_from(self.shm.buf, 0)
+        return version, bytes(self.shm.buf[_HEADER.size:_HEADER.size + length])
+
+    def write(self, data):
+        """Stores data and bumps the version. Returns the new version."""
+        if len(data) > self.capacity:
+            raise ValueError(f"Shared state is {len(data)} bytes, segment holds {self.capacity}. Raise H4_SHARED_SIZE_KB.")
+        version = self.version() + 1
+        self.shm.buf[_HEADER.size:_HEADER.size + len(data)] = data
+        _HEADER.pack_into(self.shm.buf, 0, version, len(data))
+        return version
+
+
+def shared_buffer_dir(group):
+    """RAM-backed when possible (/dev/shm), so 'disk' reads are page-cache mmaps."""
+    base = os.environ.get("H4_SHARED_DIR", "")
+    if not base:
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    path = os.path.join(base, f"h4_shared_{group}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+_FILE_SEQ = iter(range(1, 1 << 62))
+_FILE_SEQ_LOCK = threading.Lock()
+
+
+def new_buffer_path(group, slot):
+    """Unique file per publish, so readers never see a half-replaced payload."""
+    with _FILE_SEQ_LOCK:
+        seq = next(_FILE_SEQ)
+    safe_slot = "".join(c for c in slot if c.isalnum() or c in "-_") or "slot"
+    return os.path.join(shared_buffer_dir(group), f"{safe_slot}-{os.getpid()}-{seq}.safetensors")
@@ -1,7 +1,144 @@
+import math
+import os
+import threading
 import torch
 import numpy as np
 import datetime
 from .h4_utils import ANY_TYPE
+from .h4_logging import h4_log, DEBUG, ERROR
+from server import PromptServer
+
+# +ULTRA tensor stats read about H4_CONSOLE_SAMPLE values (0 = every value).
+HIST_BINS = 16
+SPARK = "▁▂▃▄▅▆▇█"
+
+
+def _strided_sample(x, budget):
+    """
+    Views at most ~budget elements spread over the whole tensor: every k-th frame
+    (<= 64 frames), then every j-th element inside each frame. Only the sample is copied.
+    """
+    if x.numel() <= budget:
+        return x.reshape(-1), False
+    if x.dim() < 2:
+        return x[::math.ceil(x.numel() / budget)], True
+    frames = min(x.shape[0], 64)
+    x = x[::math.ceil(x.shape[0] / frames)]
+    per_frame = max(1, budget // x.shape[0])
+    x = x.flatten(1)
+    return x[:, ::max(1, math.ceil(x.shape[1] / per_frame))].reshape(-1), True
+
+
+def tensor_stats(t, sample_budget=0):
+    """
+    min / max / mean / std (None if no value is finite), NaN / Inf / finite
+    counts and a HIST_BINS histogram.
+    Every reduction stays on the tensor's device and the results come back in
+    ONE .tolist() (one device sync) instead of one .item() per number.
+    sample_budget > 0 caps the work to about that many elements (strided sample).
+    """
+    x = t.detach()
+    sampled = False
+    if sample_budget and sample_budget > 0:
+        x, sampled = _strided_sample(x, sample_budget)
+    else:
+        x = x.reshape(-1)
+    x = x.float()
+
+    nan = torch.isnan(x).sum()
+    finite_mask = torch.isfinite(x)
+    finite = finite_mask.sum()
+    # Stats over finite values only (one NaN must not turn every number into NaN).
+    vals = torch.where(finite_mask, x, torch.zeros((), device=x.device))
+    lo = torch.where(finite_mask, x, torch.full((), float("inf"), device=x.device)).min()
+    hi = torch.where(finite_mask, x, torch.full((), float("-inf"), device=x.device)).max()
+    count = finite.clamp_min(1).float()
+    mean = vals.sum() / count
+    var = (torch.where(finite_mask, x - mean, torch.zeros((), device=x.device)) ** 2).sum() / (count - 1).clamp_min(1)
+
+    span = (hi - lo).clamp_min(1e-12)
+    idx = ((vals - lo) / span * HIST_BINS).long().clamp(0, HIST_BINS - 1)
+    hist = torch.bincount(idx[finite_mask], minlength=HIST_BINS)[:HIST_BINS]
+
+    packed = torch.cat([torch.stack([lo, hi, mean, var.sqrt(), nan.float(), finite.float()]), hist.float()]).tolist()
+    lo, hi, mean, std, nan, finite = packed[:6]
+    if not finite:
+        # No finite values: the placeholders above (inf / -inf / 0) mean nothing.
+        lo = hi = mean = std = None
+    return {
+        "min": lo, "max": hi, "mean": mean, "std": std,
+        "nan": int(nan), "inf": x.numel() - int(finite) - int(nan), "finite": int(finite),
+        "hist": [int(c) for c in packed[6:]],
+        "elements": x.numel(), "total": t.numel(), "sampled": sampled,
+    }
+
+
+def stats_lines(t, sample_budget=0):
+    if t.numel() == 0 or t.is_complex():
+        return ["Stats: n/a (empty or complex)"]
+    st = tensor_stats(t, sample_budget)
+    top = max(st["hist"]) or 1
+    spark = "".join(SPARK[min(len(SPARK) - 1, c * len(SPARK) // (top + 1))] if c else " " for c in st["hist"])
+    def num(v):
+        return "n/a" if v is None else f"{v:.4f}"
+    lines = [
+        f"Min: {num(st['min'])}",
+        f"Max: {num(st['max'])}",
+        f"Mean: {num(st['mean'])}",
+        f"Std: {num(st['std'])}",
+        f"NaN: {st['nan']} | Inf: {st['inf']}",
+        f"Hist: [{spark}]",
+    ]
+    if st["sampled"]:
+        lines.append(f"Sampled: {st['elements']:,} of {st['total']:,} values (strided)")
+    return lines
+
+
+class _InspectWorker:
+    """
+    Background thread for async SmartConsole reports. One pending job per node:
+    if a node runs again before its report is done, only the newest is kept.
+    """
+    def __init__(self):
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, node_key, job):
+        with self._cond:
+            self._pending[node_key] = job
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="h4_smart_console", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                node_key, job = self._pending.popitem()
+            try:
+                job()
+            except Exception as e:
+                h4_log("H4_SmartConsole", "❌ Background inspection failed: %s", e, level=ERROR)
+
+
+_WORKER = _InspectWorker()
+
+
+def _snapshot(obj):
+    """
+    What the worker gets. Tensors by reference (ComfyUI treats node outputs as
+    read-only); containers are shallow-copied so a later in-place edit of the
+    dict / list itself can't change the report.
+    """
+    if isinstance(obj, dict):
+        return dict(obj)
+    if isinstance(obj, list):
+        return list(obj)
+    return obj
+
 
 class H4_SmartConsole:
     """
@@ -10,7 +147,10 @@ class H4_SmartConsole:
     Modes: Normal vs +ULTRA.
     """
     def __init__(self):
-        pass
+        # No widgets on purpose: saved workflows store widget values by position (the log box is last).
+        self.sample_budget = int(os.environ.get("H4_CONSOLE_SAMPLE", "1000000"))
+        # H4_CONSOLE_ASYNC=1: pass through at once, report from a background thread.
+        self.background = os.environ.get("H4_CONSOLE_ASYNC", "0") not in ("0", "false", "False", "")
 
     @classmethod
     def INPUT_TYPES(s):
@@ -26,6 +166,9 @@ class H4_SmartConsole:
                 "Anything In": (ANY_TYPE, {
                     "tooltip": "Connect anything here. The node will analyze it."
                 }),
+            },
+            "hidden": {
+                "unique_id": "UNIQUE_ID",
             }
         }
 
@@ -37,16 +180,33 @@ class H4_SmartConsole:
 
     @classmethod
     def VALIDATE_INPUTS(cls, **kwargs):
-        print(f"[H4_SmartConsole][GOD MODE] 🧠 Check! Inputs: {list(kwargs.keys())}")
+        h4_log("H4_SmartConsole", "[GOD MODE] 🧠 Check! Inputs: %s", list(kwargs), level=DEBUG)
         return True
 
     def process(self, **kwargs):
         # Handle inputs with spaces via kwargs
         any_in = kwargs.get("Anything In", None)
         plus_ultra = kwargs.get("+ULTRA", False)
-        
-        log_lines = []
+        unique_id = kwargs.get("unique_id", None)
         ts = datetime.datetime.now().strftime("%H:%M:%S")
+
+        if self.background and unique_id is not None:
+            snapshot = _snapshot(any_in)
+            _WORKER.submit(unique_id, lambda: self._push_report(unique_id, snapshot, plus_ultra, ts))
+            # No "ui" here: the worker's push can beat the "executed" event, and a
+            # placeholder in onExecuted would then overwrite the finished report.
+            return {"result": (any_in,)}
+
+        ui_text = self.report(any_in, plus_ultra, ts) # Pass list, JS joins it
+        return {"ui": {"text": ui_text}, "result": (any_in,)}
+
+    def _push_report(self, unique_id, obj, plus_ultra, ts):
+        lines = self.report(obj, plus_ultra, ts)
+        PromptServer.instance.send_sync("h4.smart_console", {"node": unique_id, "text": lines})
+
+    def report(self, any_in, plus_ultra, ts):
+        """Builds the report, prints it to the console and returns its lines."""
+        log_lines = []
         input_type = type(any_in).__name__
         
         # --- HEADER ---
@@ -68,11 +228,7 @@ class H4_SmartConsole:
             print(f"{c_code}{line}{reset}")
         print(f"{c_code}------------------------{reset}")
 
-        # --- OUTPUT TO NODE UI ---
-        # Join lines for the text box
-        ui_text = log_lines # Pass list, JS joins it
-        
-        return {"ui": {"text": ui_text}, "result": (any_in,)}
+        return log_lines
 
     def analyze(self, obj, ultra):
         """Analyzes the object and returns a list of string lines."""
@@ -85,9 +241,7 @@ class H4_SmartConsole:
             lines.append(f"Device: {obj.device}")
             
             if ultra:
-                lines.append(f"Min: {obj.min().item():.4f}")
-                lines.append(f"Max: {obj.max().item():.4f}")
-                lines.append(f"Mean: {obj.mean().item():.4f}")
+                lines.extend(stats_lines(obj, self.sample_budget))
                 if obj.grad is not None:
                      lines.append("Gradient: Present")
                 else:
@@ -99,6 +253,8 @@ class H4_SmartConsole:
             lines.append(f"Keys ({len(keys)}): {keys[:5]}...")
             if "samples" in obj and isinstance(obj["samples"], torch.Tensor):
                 lines.append(f"Latent Shape: {list(obj['samples'].shape)}")
+                if ultra:
+                    lines.extend(stats_lines(obj["samples"], self.sample_budget))
             
             if ultra:
                 for k, v in obj.items():
@@ -0,0 +1,211 @@
+# FILE: custom_nodes/comfyui_h4_live/h4_tensor_io.py
+# ------------------------------------------------------------------------------
+# Tensor Payload IO (safetensors)
+# Rule 3 (Modular Architecture): One place that knows how to put payloads on disk.
+# Rule 20 (Clairvoyant Development): Payloads are nested (latent dicts, lists,
+# tuples), so we flatten them into named tensors + a JSON structure record.
+# ------------------------------------------------------------------------------
+import json
+import os
+
+_STRUCT_KEY = "h4_structure"
+
+
+class UnspillablePayload(TypeError):
+    """Raised when a payload holds objects that cannot be written as safetensors + JSON."""
+
+
+def _is_tensor(obj):
+    return hasattr(obj, "element_size") and hasattr(obj, "nelement") and hasattr(obj, "detach")
+
+
+def flatten_payload(payload, prefix="t"):
+    """
+    Splits a payload into (tensors, structure).
+    - tensors:   {name: tensor} ready for safetensors (CPU, contiguous).
+    - structure: JSON-able description that references tensors by name.
+    """
+    tensors = {}
+    names = {}  # id(tensor) -> name: a tensor referenced twice is stored once (safetensors rejects shared memory)
+
+    def walk(obj):
+        if _is_tensor(obj):
+            name = names.get(id(obj))
+            if name is None:
+                name = f"{prefix}{len(tensors)}"
+                names[id(obj)] = name
+                tensors[name] = obj.detach().to("cpu").contiguous()
+            return {"__t__": name}
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return {"__v__": obj}
+        if isinstance(obj, dict):
+            if not all(isinstance(k, str) for k in obj.keys()):
+                raise UnspillablePayload("Dict keys must be strings to spill.")
+            return {"__d__": [[k, walk(v)] for k, v in obj.items()]}
+        if isinstance(obj, tuple):
+            return {"__tu__": [walk(v) for v in obj]}
+        if isinstance(obj, list):
+            return {"__l__": [walk(v) for v in obj]}
+        raise UnspillablePayload(f"Cannot spill object of type {type(obj).__name__}.")
+
+    structure = walk(payload)
+    return tensors, structure
+
+
+def is_spillable(payload):
+    """True if flatten_payload would accept this payload (checked without copying tensors)."""
+    if _is_tensor(payload) or payload is None or isinstance(payload, (bool, int, float, str)):
+        return True
+    if isinstance(payload, dict):
+        return all(isinstance(k, str) for k in payload) and all(is_spillable(v) for v in payload.values())
+    if isinstance(payload, (list, tuple)):
+        return all(is_spillable(v) for v in payload)
+    return False
+
+
+def unflatten_payload(structure, get_tensor):
+    """Rebuilds a payload from its structure record; get_tensor(name) supplies tensors."""
+    if "__t__" in structure:
+        return get_tensor(structure["__t__"])
+    if "__v__" in structure:
+        return structure["__v__"]
+    if "__d__" in structure:
+        return {k: unflatten_payload(v, get_tensor) for k, v in structure["__d__"]}
+    if "__tu__" in structure:
+        return tuple(unflatten_payload(v, get_tensor) for v in structure["__tu__"])
+    if "__l__" in structure:
+        return [unflatten_payload(v, get_tensor) for v in structure["__l__"]]
+    raise ValueError(f"Unknown structure record: {list(structure.keys())}")
+
+
+def save_payload(path, payload, metadata=None):
+    """
+    Writes a payload to a single .safetensors file.
+    The structure record (and any extra string metadata) lives in the header.
+    Returns the file size in bytes.
+    """
+    from safetensors.torch import save_file
+
+    tensors, structure = flatten_payload(payload)
+    header = {str(k): str(v) for k, v in (metadata or {}).items()}
+    header[_STRUCT_KEY] = json.dumps(structure)
+
+    # Write-then-rename so a crash never leaves a half-written file behind.
+    tmp_path = f"{path}.tmp"
+    save_file(tensors, tmp_path, metadata=header)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def load_payload(path, device="cpu"):
+    """
+    Reads a payload written by save_payload.
+    safe_open memory-maps the file, so tensor pages are only faulted in when touched.
+    """
+    from safetensors import safe_open
+
+    with safe_open(path, framework="pt", device=device) as handle:
+        header = handle.metadata() or {}
+        structure = json.loads(header[_STRUCT_KEY])
+        return unflatten_payload(structure, handle.get_tensor)
+
+
+def read_metadata(path):
+    """Returns the string metadata stored in a payload file (without loading tensors)."""
+    from safetensors import safe_open
+
+    with safe_open(path, framework="pt", device="cpu") as handle:
+        header = dict(handle.metadata() or {})
+    header.pop(_STRUCT_KEY, None)
+    return header
+
+
+# ------------------------------------------------------------------------------
+# Residency (pack on store / unpack on read)
+# ------------------------------------------------------------------------------
+RESIDENCY_MODES = ("keep", "pinned_cpu", "compact_fp16", "compact_uint8")
+
+
+def map_tensors(payload, fn, _key=None):
+    """
+    Returns a copy of payload with fn(tensor, key) applied to every tensor leaf.
+    Containers are rebuilt; non-tensor leaves are shared, not copied.
+    Traversal order matches flatten_payload, so per-tensor plans line up.
+    """
+    if _is_tensor(payload):
+        return fn(payload, _key)
+    if isinstance(payload, dict):
+        return {k: map_tensors(v, fn, k) for k, v in payload.items()}
+    if isinstance(payload, tuple):
+        return tuple(map_tensors(v, fn, _key) for v in payload)
+    if isinstance(payload, list):
+        return [map_tensors(v, fn, _key) for v in payload]
+    return payload
+
+
+def _is_image_or_mask(t):
+    """IMAGE [B,H,W,C] (C = 1/3/4) or MASK [B,H,W] floats in [0, 1] - lossless enough for uint8."""
+    if not _is_tensor(t) or not t.is_floating_point() or t.numel() == 0:
+        return False
+    if not (t.dim() == 3 or (t.dim() == 4 and t.shape[-1] in (1, 3, 4))):
+        return False
+    lo, hi = t.aminmax()
+    return bool(lo >= 0.0) and bool(hi <= 1.0)
+
+
+def pack_payload(payload, mode):
+    """
+    Applies a residency policy to every tensor in a payload.
+    - keep:          untouched (stays on its source device).
+    - pinned_cpu:    moved to page-locked CPU memory (fast async H2D copies).
+    - compact_fp16:  fp32/fp64 stored as fp16.
+    - compact_uint8: a top-level IMAGE / MASK tensor is quantised to uint8; every
+                     other float (latents, conditioning, floats in lists) falls back to fp16.
+    Returns (packed_payload, plan); plan is None for 'keep'.
+    """
+    if mode not in RESIDENCY_MODES or mode == "keep":
+        return payload, None
+
+    import torch
+
+    plan = []
+    can_pin = torch.cuda.is_available()
+    quantise = mode == "compact_uint8" and _is_image_or_mask(payload)
+
+    def pack(t, key):
+        src_dtype = t.dtype
+        scale = 1.0
+        top_level = t is payload
+        t = t.detach()
+        if mode == "pinned_cpu":
+            t = t.to("cpu")
+            if can_pin:
+                t = t.pin_memory()
+        elif t.is_floating_point():
+            if quantise and top_level:
+                t = (t.clamp(0.0, 1.0) * 255.0).round().to(torch.uint8)
+                scale = 255.0
+            elif t.dtype in (torch.float32, torch.float64):
+                t = t.to(torch.float16)
+        plan.append((src_dtype, scale))
+        return t
+
+    return map_tensors(payload, pack), plan
+
+
+def unpack_payload(payload, plan):
+    """Restores the original dtypes recorded by pack_payload."""
+    if not plan:
+        return payload
+
+    steps = iter(plan)
+
+    def unpack(t, key):
+        dtype, scale = next(steps)
+        if t.dtype != dtype:
+            t = t.to(dtype)
+            if scale != 1.0:
+                t = t / scale
+        return t
+
+    return map_tensors(payload, unpack)
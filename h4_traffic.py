@@ -5,14 +5,76 @@
 # Rule 11 (Logging): Detailed payload inspection.
 # Rule 21 (Debug Review): Input/Output validation.
 # ------------------------------------------------------------------------------
-from .h4_core import get_state, increment_loop, reset_state, orbit_set, orbit_get, buffer_image, get_buffered_image
-from .h4_utils import ANY_TYPE
-import datetime
-
-def _log(node_name: str, message: str):
-    """Internal helper to standardize logging format per Rule 11."""
-    ts = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-    print(f"[h4_Live][{node_name}][{ts}] {message}")
+import math
+from .h4_core import get_state, increment_loop, reset_state, advance_loop, consume_reset_flag, orbit_set, orbit_get, buffer_image, get_buffered_image, has_buffered_data, resolve_slot_name, state_fingerprint, buffer_status, configure_buffer, RESIDENCY_MODES
+from .h4_utils import ANY_TYPE, LOOP_NAME_INPUT, SLOT_NAME_INPUT
+from .h4_logging import h4_log, is_enabled, DEBUG, INFO, WARNING, ERROR
+from .h4_schedule import SCHEDULE_TYPE
+from server import PromptServer
+from aiohttp import web
+
+# ExecutionBlocker lets a node prune a whole downstream branch (newer ComfyUI only).
+try:
+    from comfy_execution.graph import ExecutionBlocker
+except ImportError:
+    ExecutionBlocker = None
+
+COP_MODES = ["Block Inactive", "Ghost Data (Compat)"]
+
+@PromptServer.instance.routes.get("/h4/buffer_status")
+async def h4_buffer_status(request):
+    """Reports Universal Buffer occupancy (slots, bytes, budget)."""
+    return web.json_response(buffer_status())
+
+@PromptServer.instance.routes.post("/h4/buffer_config")
+async def h4_buffer_config(request):
+    """Updates the buffer ceiling / TTL. Body: {"max_mb": float, "ttl_s": float, "spill": bool}."""
+    try:
+        body = await request.json()
+    except Exception:
+        body = {}
+    if not isinstance(body, dict):
+        return web.json_response({"error": "Body must be a JSON object."}, status=400)
+    try:
+        max_mb = _non_negative(body, "max_mb")
+        ttl_s = _non_negative(body, "ttl_s")
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    spill = body.get("spill")
+    if spill is not None and not isinstance(spill, bool):
+        return web.json_response({"error": "spill must be true or false."}, status=400)
+    configure_buffer(
+        max_bytes=None if max_mb is None else max_mb * 1024 * 1024,
+        ttl_seconds=ttl_s,
+        spill=spill,
+    )
+    return web.json_response(buffer_status())
+
+def _non_negative(body, key):
+    """body[key] as a finite float >= 0, None if absent. ValueError otherwise."""
+    value = body.get(key)
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number, got {value!r}.")
+    if not math.isfinite(number) or number < 0:
+        raise ValueError(f"{key} must be a finite number >= 0, got {value!r}.")
+    return number
+
+def _log(node_name: str, message, *args, level=INFO):
+    """Internal helper to standardize logging format per Rule 11 (level-gated, lazy %-args)."""
+    h4_log(node_name, message, *args, level=level)
+
+def _latent_signature(payload):
+    """
+    Per-item LATENT shape ([C, H, W(, ...)]) used to check loop data against Run 0.
+    None for anything else (IMAGE loops may legitimately change size). Batch is ignored.
+    """
+    if isinstance(payload, dict) and hasattr(payload.get("samples"), "shape"):
+        return list(payload["samples"].shape[1:])
+    return None
 
 class H4_TrafficRouter:
     """
@@ -46,6 +108,7 @@ class H4_TrafficRouter:
             "optional": {
                 "first_run_in": (ANY_TYPE, {"tooltip": "Items for the FIRST run (Run 0)."}),
                 "loop_run_in": (ANY_TYPE, {"tooltip": "Items for the LOOP runs (Run 1+)."}),
+                "loop_name": LOOP_NAME_INPUT,
             }
         }
 
@@ -68,24 +131,28 @@ class H4_TrafficRouter:
     CATEGORY = "h4_Live/Logic"
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        return float("nan")
+    def IS_CHANGED(cls, restart=False, loop_name=None, **kwargs):
+        # Held restart: every run is Run 0 -> same output, reuse the cache.
+        if restart:
+            return "restart|" + state_fingerprint(loop_name)
+        # Otherwise this node bumps the counter, so its own write invalidates it next time.
+        return state_fingerprint(loop_name, include_touch=True)
 
     @classmethod
     def VALIDATE_INPUTS(cls, **kwargs):
-         print(f"[H4_TrafficRouter][GOD MODE] 🚦 Nexus Check! Inputs: {list(kwargs.keys())}")
+         _log("H4_TrafficRouter", "[GOD MODE] 🚦 Nexus Check! Inputs: %s", list(kwargs), level=DEBUG)
          return True
 
-    def check_lazy_status(self, first_denoise=None, loop_denoise=None, restart=False, first_run_in=None, loop_run_in=None, **kwargs):
+    def check_lazy_status(self, first_denoise=None, loop_denoise=None, restart=False, first_run_in=None, loop_run_in=None, loop_name=None, **kwargs):
         node_id = "TrafficRouter"
         try:
             # Always need these controls
             needed = ["first_denoise", "loop_denoise", "restart"]
             
-            print(f"[H4_TrafficRouter][GOD MODE] 💤 Lazy Check... Args: {list(kwargs.keys())}")
-            _log(node_id, f"Lazy Check | Restart: {restart}")
+            _log("H4_TrafficRouter", "[GOD MODE] 💤 Lazy Check... Args: %s", list(kwargs), level=DEBUG)
+            _log(node_id, "Lazy Check | Restart: %s", restart, level=DEBUG)
             
-            state = get_state()
+            state = get_state(loop_name)
             count = state.get("loop_count", -1)
             
             if restart:
@@ -97,38 +164,32 @@ class H4_TrafficRouter:
             else:
                 needed.append("loop_run_in")
                 
-            print(f"[H4_TrafficRouter][GOD MODE] 💤 Lazy Result: {needed}")    
+            _log("H4_TrafficRouter", "[GOD MODE] 💤 Lazy Result: %s", needed, level=DEBUG)
             return needed
         except Exception as e:
-            _log(node_id, f"Lazy Check Error: {e}")
+            _log(node_id, "Lazy Check Error: %s", e, level=ERROR)
             return []
 
-    def process_router(self, first_denoise, loop_denoise, restart, first_run_in=None, loop_run_in=None):
+    def process_router(self, first_denoise, loop_denoise, restart, first_run_in=None, loop_run_in=None, loop_name=None):
         node_id = "TrafficRouter"
         
-        # 1. Handle Reset
+        # 1. Handle Reset + claim this run's ID (atomic read-then-increment)
         if restart:
             _log(node_id, "⚠️ RESTART SIGNAL RECEIVED")
-            current_count = reset_state()
-        else:
-            state = get_state()
-            current_count = state["loop_count"]
+        current_count = advance_loop(loop_name, restart)
             
-        _log(node_id, f"Processing Nexus | ID: {current_count}")
-        
-        if not restart:
-            increment_loop()
+        _log(node_id, "Processing Nexus | Loop: %s | ID: %s", loop_name, current_count)
 
         # 3. Routing Logic & Denoise Selection
         if current_count == 0:
-            _log(node_id, f"👉 Route: START MODE (Run 0) | Denoise: {first_denoise}")
+            _log(node_id, "👉 Route: START MODE (Run 0) | Denoise: %s", first_denoise)
             if first_run_in is None:
                 # Flawless Logic: If start is missing, check if loop is there (fallback)? No, Start 0 needs Start.
                 raise ValueError(f"[{node_id}] CRITICAL: 'first_run_in' is missing! I cannot start without it.")
             
             return (first_run_in, first_denoise)
         else:
-            _log(node_id, f"👉 Route: LOOP MODE (Run {current_count}) | Denoise: {loop_denoise}")
+            _log(node_id, "👉 Route: LOOP MODE (Run %s) | Denoise: %s", current_count, loop_denoise)
             if loop_run_in is None:
                  # Flawless Logic: If Loop is missing, try First Run as backup (e.g. single run mode)?
                  if first_run_in is not None:
@@ -160,6 +221,14 @@ class H4_TrafficCop:
                     "tooltip": "Turn this ON to start continuously from the beginning. Turn it OFF to allow looping."
                 }),
             },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+                "inactive_mode": (COP_MODES, {
+                    # Compat is the default: existing workflows wire Run_Once into branches that must keep running.
+                    "default": COP_MODES[1],
+                    "tooltip": "Block Inactive: the unused output stops its branch (nothing downstream runs). Ghost Data: both outputs carry the input (old behavior, default)."
+                }),
+            }
         }
 
     # Two outputs: Friendly Names
@@ -174,10 +243,13 @@ class H4_TrafficCop:
     I help you run things differently 
     the first time vs the next times.
     
-    **SAFE MODE ACTIVE:**
-    I will never output 'Nothing'. 
-    If a path is inactive, I send the data anyway 
-    to prevent your workflow from crashing.
+    **Ghost Data (Compat, default):**
+    The old safe mode. Both paths get the data,
+    so both branches run every time.
+    
+    **Block Inactive:**
+    The path that is not active is switched off,
+    so everything behind it is skipped (saves GPU time).
     """
     
     FUNCTION = "process_logic"
@@ -190,45 +262,45 @@ class H4_TrafficCop:
 
     @classmethod
     def VALIDATE_INPUTS(cls, **kwargs):
-        print(f"[H4_TrafficCop][GOD MODE] 🚦 Check! Inputs: {list(kwargs.keys())}")
+        _log("H4_TrafficCop", "[GOD MODE] 🚦 Check! Inputs: %s", list(kwargs), level=DEBUG)
         return True
 
-    def process_logic(self, any_input, restart_on_true):
+    def process_logic(self, any_input, restart_on_true, loop_name=None, inactive_mode=None):
         node_id = "TrafficCop"
         
         # 0. Log Inputs (Rule 24: Nuclear Debugging)
-        input_type = type(any_input).__name__
-        _log(node_id, f"📥 Received Input Type: {input_type}")
+        _log(node_id, "📥 Received Input Type: %s", type(any_input).__name__, level=DEBUG)
         if restart_on_true:
              _log(node_id, "⚠️ RESTART SIGNAL RECEIVED")
 
-        # 1. Handle Reset Request
-        if restart_on_true:
-            current_count = reset_state()
-        else:
-            state = get_state()
-            current_count = state["loop_count"]
+        # 1. Handle Reset Request (+ increment for the *next* pass, atomically)
+        current_count = advance_loop(loop_name, restart_on_true)
 
         # 2. Log Decision
-        _log(node_id, f"Processing Logic | ID: {current_count}")
-
-        # 3. Increment for the *next* pass
-        if not restart_on_true:
-            increment_loop()
+        _log(node_id, "Processing Logic | Loop: %s | ID: %s", loop_name, current_count)
         
         # Validation
         if any_input is None:
              raise ValueError(f"[{node_id}] ERROR: Input is missing! I cannot split 'Nothing'.")
 
-        # 4. Route Traffic (Safe Mode)
+        # 3. Pick what the inactive output carries.
+        # Prompts saved before inactive_mode existed omit it -> keep their ghost behavior.
+        inactive = any_input
+        if inactive_mode == COP_MODES[0]:
+            if ExecutionBlocker is not None:
+                inactive = ExecutionBlocker(None)  # None = silent block, no error shown.
+            else:
+                _log(node_id, "⚠️ ExecutionBlocker not available in this ComfyUI. Falling back to Ghost Data.", level=WARNING)
+
+        # 4. Route Traffic
         if current_count == 0:
             _log(node_id, "👉 Routing to: RUN ONCE (Start)")
-            # Run 0: Active on Top, Fallback on Bottom
-            return (any_input, any_input)
+            # Run 0: Active on Top, Blocked/Ghost on Bottom
+            return (any_input, inactive)
         else:
             _log(node_id, "👉 Routing to: LOOP (Continue)")
-            # Run 1+: Fallback on Top, Active on Bottom
-            return (any_input, any_input)
+            # Run 1+: Blocked/Ghost on Top, Active on Bottom
+            return (inactive, any_input)
 
 class H4_TrafficMerge:
     """
@@ -261,8 +333,10 @@ class H4_TrafficMerge:
                 }),
             },
             "optional": {
-                "run_once_input": (ANY_TYPE, {"tooltip": "The item to use for the very first time only."}),
-                "loop_input": (ANY_TYPE, {"tooltip": "⚠️ LEAVE EMPTY FOR LOOPS! Use H4_ImageBuffer wireless mode instead. Wiring this directly causes ComfyUI Cycle Errors."}),
+                "run_once_input": (ANY_TYPE, {"lazy": True, "tooltip": "The item to use for the very first time only."}),
+                "loop_input": (ANY_TYPE, {"lazy": True, "tooltip": "⚠️ LEAVE EMPTY FOR LOOPS! Use H4_ImageBuffer wireless mode instead. Wiring this directly causes ComfyUI Cycle Errors."}),
+                "loop_name": LOOP_NAME_INPUT,
+                "slot_name": SLOT_NAME_INPUT,
             }
         }
 
@@ -274,6 +348,7 @@ class H4_TrafficMerge:
     
     Merges two inputs into one stream.
     Selects Denoise value automatically.
+    Only the branch that is selected gets computed (lazy inputs).
     
     **CRITICAL WARNING:**
     Due to ComfyUI limitations, you CANNOT wire the loop input directly from a later node (Cycle Error).
@@ -283,36 +358,59 @@ class H4_TrafficMerge:
     FUNCTION = "process_merge"
     CATEGORY = "h4_Live/Logic"
 
-    # CRITICAL: Always update
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        return float("nan")
+    def IS_CHANGED(cls, restart_on_true=False, loop_name=None, slot_name=None, **kwargs):
+        # Loop runs read the wireless buffer and the Run 0 type record as well.
+        slot = resolve_slot_name(slot_name)
+        if restart_on_true:
+            return "restart|" + state_fingerprint(loop_name)
+        return state_fingerprint(loop_name, orbit_keys=("setup_type_name",), slot_name=slot, include_touch=True)
 
     @classmethod
     def VALIDATE_INPUTS(cls, **kwargs):
-        print(f"[H4_TrafficMerge][GOD MODE] 🤐 Check! Inputs: {list(kwargs.keys())}")
+        _log("H4_TrafficMerge", "[GOD MODE] 🤐 Check! Inputs: %s", list(kwargs), level=DEBUG)
         
         # PROACTIVE WARNING:
         if "loop_input" in kwargs:
-             print("[H4_TrafficMerge] ⚠️ CRITICAL WARNING: You have wired 'loop_input'. This WILL cause a ComfyUI Cycle Error during loops. Please UNPLUG it and use H4_ImageBuffer wirelessly!")
+             _log("H4_TrafficMerge", "⚠️ CRITICAL WARNING: You have wired 'loop_input'. This WILL cause a ComfyUI Cycle Error during loops. Please UNPLUG it and use H4_ImageBuffer wirelessly!", level=WARNING)
              
         return True
 
-    def process_merge(self, first_denoise, loop_denoise, restart_on_true, run_once_input=None, loop_input=None):
+    def check_lazy_status(self, first_denoise=None, loop_denoise=None, restart_on_true=False, loop_name=None, slot_name=None, **branches):
+        """
+        Asks ComfyUI for the ONE branch this run will use.
+        Unconnected inputs are absent from branches; connected-but-unevaluated ones arrive as None.
+        """
+        node_id = "TrafficZipper"
+        try:
+            count = get_state(loop_name).get("loop_count", -1)
+            _log(node_id, "Lazy Check | Restart: %s | Count: %s", restart_on_true, count, level=DEBUG)
+
+            if restart_on_true or count == 0:
+                wanted = "run_once_input"
+            elif "loop_input" in branches:
+                wanted = "loop_input"
+            elif has_buffered_data(slot_name):
+                wanted = None  # Wireless mode: the buffer supplies the loop data.
+            else:
+                wanted = "run_once_input"  # Empty buffer: process_merge falls back to the setup input.
+
+            needed = [wanted] if wanted in branches and branches[wanted] is None else []
+            _log("H4_TrafficMerge", "[GOD MODE] 💤 Lazy Result: %s", needed, level=DEBUG)
+            return needed
+        except Exception as e:
+            _log(node_id, "Lazy Check Error: %s", e, level=ERROR)
+            return [k for k, v in branches.items() if v is None]
+
+    def process_merge(self, first_denoise, loop_denoise, restart_on_true, run_once_input=None, loop_input=None, loop_name=None, slot_name=None):
         node_id = "TrafficZipper"
         
-        # 1. Handle Reset
+        # 1. Handle Reset + claim this run's ID (atomic read-then-increment)
         if restart_on_true:
             _log(node_id, "⚠️ RESTART SIGNAL RECEIVED")
-            current_count = reset_state()
-        else:
-            state = get_state()
-            current_count = state["loop_count"]
+        current_count = advance_loop(loop_name, restart_on_true)
             
-        _log(node_id, f"Processing Merge | ID: {current_count}")
-        
-        if not restart_on_true:
-            increment_loop()
+        _log(node_id, "Processing Merge | Loop: %s | ID: %s", loop_name, current_count)
 
         # 3. Select w/ Logging
         # 3. Select w/ Logging
@@ -324,19 +422,20 @@ class H4_TrafficMerge:
             
             # MEMORY: Save the expected type for future runs
             item_type = type(run_once_input).__name__
-            orbit_set("setup_type_name", item_type) 
+            orbit_set("setup_type_name", item_type, loop_name)
+            orbit_set("setup_latent_shape", _latent_signature(run_once_input), loop_name)
             
-            _log(node_id, f"👉 Selecting: SETUP Input ({item_type}) | Denoise: {first_denoise}")
+            _log(node_id, "👉 Selecting: SETUP Input (%s) | Denoise: %s", item_type, first_denoise)
             return (run_once_input, first_denoise)
             
         else:
-            _log(node_id, f"👉 Routing to: LOOP MODE (Run {current_count}) | Denoise: {loop_denoise}")
+            _log(node_id, "👉 Routing to: LOOP MODE (Run %s) | Denoise: %s", current_count, loop_denoise)
             
             # WIRELESS FALLBACK
             final_loop_input = loop_input
             if loop_input is None:
-                _log(node_id, "📡 WIRELESS MODE ENGAGED: Checking Universal Buffer...")
-                buffered_data = get_buffered_image() # This is now 'get_buffered_data' effectively
+                _log(node_id, "📡 WIRELESS MODE ENGAGED: Checking Universal Buffer (Slot: %s)...", slot_name)
+                buffered_data = get_buffered_image(slot_name) # This is now 'get_buffered_data' effectively
                 
                 if buffered_data is not None:
                      _log(node_id, "✅ Wireless Data Acquired!")
@@ -353,7 +452,7 @@ class H4_TrafficMerge:
 
             # TYPE SAFETY CHECK (MEMORY BASED)
             # Retrieve what we saw in Run 0
-            expected_type_name = orbit_get("setup_type_name")
+            expected_type_name = orbit_get("setup_type_name", loop_name)
             current_type_name = type(final_loop_input).__name__
             
             # If we have a memory record, we must enforce it.
@@ -367,16 +466,148 @@ class H4_TrafficMerge:
                 msg += "   👉 FIX: Check your 'H4_ImageBuffer'. It captures changes. Is it connected to the same type of output?\n"
                 msg += "      (Example: If Run 0 is LATENT, Buffer must capture LATENT, not IMAGE)."
                 
-                _log(node_id, "CRITICAL ERROR: Type Mismatch.")
-                print(f"\n{msg}\n")
+                _log(node_id, "CRITICAL ERROR: Type Mismatch.\n%s", msg, level=ERROR)
+                raise ValueError(msg)
+
+            # SHAPE SAFETY CHECK (latent channels / size must match Run 0)
+            expected_sig = orbit_get("setup_latent_shape", loop_name)
+            current_sig = _latent_signature(final_loop_input)
+            if expected_sig and current_sig and expected_sig != current_sig:
+                msg = f"[{node_id}] ⛔ LATENT SHAPE MISMATCH DETECTED!\n"
+                msg += f"   - SETUP Input (Run 0) was: [C, H, W] = {expected_sig}\n"
+                msg += f"   - LOOP  Input (Run {current_count}) is : [C, H, W] = {current_sig}\n\n"
+                msg += "   👉 FIX: Latent loops need the same model family (channels) and resolution on every pass.\n"
+                msg += "      Did an upscale or a different VAE sneak into the loop?"
+                _log(node_id, "CRITICAL ERROR: Shape Mismatch.\n%s", msg, level=ERROR)
                 raise ValueError(msg)
 
             # Fallback for legacy (if reset didn't happen properly)
             # if run_once_input is not None: ... (Removed, memory is superior)
 
-            _log(node_id, f"👉 Selecting: LOOP Input ({current_type_name}) | Denoise: {loop_denoise}")
+            _log(node_id, "👉 Selecting: LOOP Input (%s) | Denoise: %s", current_type_name, loop_denoise)
             return (final_loop_input, loop_denoise)
 
+class H4_PhaseRouter:
+    """
+    🎛️ H4 Phase Router (N-Way)
+    Picks ONE of up to 8 inputs per run from a phase table (or a compiled
+    schedule), and emits that phase's denoise / cfg / steps.
+    Only the selected input's subgraph is executed (lazy inputs).
+    """
+
+    MAX_INPUTS = 8
+
+    @classmethod
+    def INPUT_TYPES(s):
+        optional = {
+            f"input_{i}": (ANY_TYPE, {"lazy": True, "tooltip": f"Branch for phases that select input {i}."})
+            for i in range(1, s.MAX_INPUTS + 1)
+        }
+        optional["schedule"] = (SCHEDULE_TYPE, {"tooltip": "Optional: Use a compiled schedule instead of the table (columns: phase, denoise, cfg, steps)."})
+        optional["loop_name"] = LOOP_NAME_INPUT
+        return {
+            "required": {
+                "phase_table": ("STRING", {
+                    "default": "# from_run : input : denoise, cfg, steps\n0 : 1 : 1.00, 7.0, 30\n1 : 2 : 0.55, 6.0, 20\n4 : 3 : 0.35, 5.5, 20",
+                    "multiline": True,
+                    "tooltip": "One phase per line. The last line whose from_run <= the loop count wins."
+                }),
+                "restart": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "True = Reset to 0. False = Continue Looping."
+                }),
+            },
+            "optional": optional,
+        }
+
+    RETURN_TYPES = (ANY_TYPE, "FLOAT", "FLOAT", "INT", "INT")
+    RETURN_NAMES = ("Selected_Output", "Denoise_Val", "CFG_Val", "Steps_Val", "Phase_Input")
+    FUNCTION = "process_phase"
+    CATEGORY = "h4_Live/Logic"
+
+    DESCRIPTION = """
+    🎛️ **H4 Phase Router (N-Way)**
+
+    One node for multi-phase loops (compose -> refine -> upscale -> detail).
+    Each run selects exactly one input, and only that branch is computed.
+
+    **Phase Table:** `from_run : input : denoise, cfg, steps`
+    Example: `4 : 3 : 0.35, 5.5, 20` = from run 4 on, use input_3 with these values.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, restart=False, loop_name=None, **kwargs):
+        if restart:
+            return "restart|" + state_fingerprint(loop_name)
+        return state_fingerprint(loop_name, include_touch=True)
+
+    @staticmethod
+    def parse_table(text):
+        """[(from_run, input_index, denoise, cfg, steps), ...] sorted by from_run."""
+        phases = []
+        for line_no, raw in enumerate(text.splitlines(), start=1):
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = [p.strip() for p in line.split(":")]
+            if len(parts) != 3:
+                raise ValueError(f"Phase table line {line_no}: expected 'from_run : input : denoise, cfg, steps', got '{raw.strip()}'")
+            values = [v.strip() for v in parts[2].split(",")]
+            if len(values) != 3:
+                raise ValueError(f"Phase table line {line_no}: need 3 values (denoise, cfg, steps), got {len(values)}")
+            phases.append((int(parts[0]), int(parts[1]), float(values[0]), float(values[1]), int(float(values[2]))))
+        if not phases:
+            raise ValueError("Phase table is empty.")
+        return sorted(phases, key=lambda p: p[0])
+
+    @classmethod
+    def select_phase(cls, phase_table, count, schedule=None):
+        """Returns (input_index, denoise, cfg, steps) for a loop count."""
+        if schedule is not None:
+            row = schedule.row(count)
+            if "phase" not in row:
+                raise ValueError(f"Schedule has no 'phase' column. Available: {list(row)}")
+            return (int(row["phase"]), float(row.get("denoise", 1.0)), float(row.get("cfg", 7.0)), int(row.get("steps", 20)))
+        phases = cls.parse_table(phase_table)
+        chosen = phases[0]
+        for phase in phases:
+            if phase[0] <= count:
+                chosen = phase
+        return chosen[1:]
+
+    def check_lazy_status(self, phase_table=None, restart=False, schedule=None, loop_name=None, **branches):
+        node_id = "PhaseRouter"
+        try:
+            count = 0 if restart else get_state(loop_name).get("loop_count", 0)
+            index = self.select_phase(phase_table, count, schedule)[0]
+            wanted = f"input_{index}"
+            needed = [wanted] if wanted in branches and branches[wanted] is None else []
+            _log(node_id, "[GOD MODE] 💤 Lazy Result: Run %s -> %s", count, needed, level=DEBUG)
+            return needed
+        except Exception as e:
+            # Bad table: let process_phase raise the readable error, compute nothing extra.
+            _log(node_id, "Lazy Check Error: %s", e, level=ERROR)
+            return []
+
+    def process_phase(self, phase_table, restart, schedule=None, loop_name=None, **branches):
+        node_id = "PhaseRouter"
+
+        if restart:
+            _log(node_id, "⚠️ RESTART SIGNAL RECEIVED")
+        current_count = advance_loop(loop_name, restart)
+
+        try:
+            index, denoise, cfg, steps = self.select_phase(phase_table, current_count, schedule)
+        except ValueError as e:
+            raise ValueError(f"[{node_id}] {e}")
+
+        selected = branches.get(f"input_{index}")
+        if selected is None:
+            raise ValueError(f"[{node_id}] CRITICAL: Run {current_count} selects 'input_{index}', but nothing is connected there.")
+
+        _log(node_id, "👉 Run %s -> input_%s | Denoise: %s | CFG: %s | Steps: %s", current_count, index, denoise, cfg, steps)
+        return (selected, denoise, cfg, steps, index)
+
 class H4_StateMonitor:
     """
     Debug Node (Friendly Version).
@@ -386,7 +617,8 @@ class H4_StateMonitor:
         return {
             "required": {},
             "optional": {
-                 "Any_In": (ANY_TYPE, {"tooltip": "Optional: Connect an output here to force this monitor to wait for that node (Daisy Chaining)."})
+                 "Any_In": (ANY_TYPE, {"tooltip": "Optional: Connect an output here to force this monitor to wait for that node (Daisy Chaining)."}),
+                 "loop_name": LOOP_NAME_INPUT,
             }
         }
     
@@ -408,11 +640,11 @@ class H4_StateMonitor:
     CATEGORY = "h4_Live/Debug"
 
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        return float("nan")
+    def IS_CHANGED(cls, loop_name=None, **kwargs):
+        return state_fingerprint(loop_name)
 
-    def report_state(self, Any_In=None):
-        state = get_state()
+    def report_state(self, Any_In=None, loop_name=None):
+        state = get_state(loop_name)
         return (state["loop_count"], Any_In)
 
 
@@ -438,6 +670,9 @@ class H4_LoopIncrementer:
                     "tooltip": "ON=Check orbit storage for reset signal (no wire needed)."
                 }),
             },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+            }
         }
     
     RETURN_TYPES = (ANY_TYPE,)
@@ -449,20 +684,19 @@ class H4_LoopIncrementer:
     def IS_CHANGED(cls, **kwargs):
         return float("nan")
     
-    def do_increment(self, pulse, wireless_reset):
+    def do_increment(self, pulse, wireless_reset, loop_name=None):
         node_id = "LoopIncrementer"
         
         # Check wireless reset flag
         if wireless_reset:
-            reset_flag = orbit_get("request_reset")
-            if reset_flag is True:
-                _log(node_id, "📡 Wireless Reset Signal Detected!")
-                reset_state()
-                orbit_set("request_reset", False)  # clear it
+            # Compare-and-swap so only one worker consumes the signal
+            if consume_reset_flag(loop_name):
+                _log(node_id, "📡 Wireless Reset Signal Detected! | Loop: %s", loop_name)
+                reset_state(loop_name)
                 return (pulse,)
         
         # Normal increment
-        increment_loop()
+        increment_loop(loop_name)
         return (pulse,)
 
 class H4_WirelessResetButton:
@@ -480,6 +714,9 @@ class H4_WirelessResetButton:
                     "label": "🔴 RESET (Wireless)",
                     "tooltip": "Toggle ON to reset counter (wireless to H4_LoopIncrementer)."
                 }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
             }
         }
     
@@ -493,9 +730,9 @@ class H4_WirelessResetButton:
     def IS_CHANGED(cls, **kwargs):
         return float("nan")
     
-    def send_reset(self, trigger_reset):
+    def send_reset(self, trigger_reset, loop_name=None):
         if trigger_reset:
-            orbit_set("request_reset", True)
+            orbit_set("request_reset", True, loop_name)
             return ("✅ RESET SENT",)
         return ("Idle...",)
 
@@ -512,6 +749,11 @@ class H4_ImageBuffer:
             "required": {},
             "optional": {
                 "image_in": (ANY_TYPE, {"tooltip": "Wire ANYTHING here (Image, Latent, etc) to Store. Leave empty to Load."}),
+                "slot_name": SLOT_NAME_INPUT,
+                "residency": (list(RESIDENCY_MODES), {
+                    "default": "keep",
+                    "tooltip": "keep: Leave tensors where they are. pinned_cpu: Park in page-locked RAM (fast transfer back). compact_fp16 / compact_uint8: Store smaller, restore dtype on read."
+                }),
             }
         }
     
@@ -529,38 +771,105 @@ class H4_ImageBuffer:
     def IS_CHANGED(cls, **kwargs):
         return float("nan")
     
-    def buffer_and_pass(self, image_in=None):
+    def buffer_and_pass(self, image_in=None, slot_name=None, residency="keep"):
         node_id = "UniversalBuffer"
         
         # 1. STORE (Write Mode)
         if image_in is not None:
-            # Debug: What are we buffering?
-            t = type(image_in)
-            info = str(t)
-            if hasattr(image_in, "shape"):
-                info += f" shape={image_in.shape}"
-            elif hasattr(image_in, "__len__"):
-                info += f" len={len(image_in)}"
-            elif isinstance(image_in, (int, float, str)):
-                info += f" val={str(image_in)[:50]}"
-                
-            print(f"[{node_id}] 📥 BUFFERING Data: {info}")
+            # Debug: What are we buffering? (only inspected when DEBUG is on)
+            if is_enabled(DEBUG):
+                t = type(image_in)
+                info = str(t)
+                if hasattr(image_in, "shape"):
+                    info += f" shape={image_in.shape}"
+                elif hasattr(image_in, "__len__"):
+                    info += f" len={len(image_in)}"
+                elif isinstance(image_in, (int, float, str)):
+                    info += f" val={str(image_in)[:50]}"
+                    
+                _log(node_id, "📥 BUFFERING Data: %s | Slot: %s", info, slot_name, level=DEBUG)
             
-            # Store it globally (overwriting old data)
-            buffer_image(image_in) 
+            # Store it in the named slot (overwriting old data in that slot only)
+            buffer_image(image_in, slot_name, residency)
             return (image_in,)
 
         # 2. RETRIEVE (Read/Pass-Through Mode)
-        print(f"[{node_id}] ⚠️ Input is None. Checking Backup...")
-        buffered = get_buffered_image()
+        _log(node_id, "⚠️ Input is None. Checking Backup...", level=DEBUG)
+        buffered = get_buffered_image(slot_name)
         
         if buffered is not None:
-             print(f"[{node_id}] 📤 RECYCLING Last Data.")
+             _log(node_id, "📤 RECYCLING Last Data.")
              return (buffered,)
         
         # 3. FAIL SOFTLY
-        print(f"[{node_id}] ❌ EMPTY. Nothing to pass.")
+        _log(node_id, "❌ EMPTY. Nothing to pass.", level=WARNING)
         return (None,)
+
+
+class H4_LatentDecodeEveryN:
+    """
+    🖼️ H4 Latent Decode (Every N)
+    Keeps the loop in latent space and only runs the VAE when a preview /
+    save is actually due. Off-runs block the IMAGE branch entirely.
+    """
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "samples": ("LATENT", {"tooltip": "The loop latent (same one you buffer)."}),
+                "vae": ("VAE",),
+                "every_n": ("INT", {
+                    "default": 4, "min": 1, "max": 10000,
+                    "tooltip": "Decode when the loop count is a multiple of this. 1 = every run."
+                }),
+                "force_decode": ("BOOLEAN", {
+                    "default": False,
+                    "tooltip": "True = Decode this run no matter what (e.g. for the final save)."
+                }),
+            },
+            "optional": {
+                "loop_name": LOOP_NAME_INPUT,
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "LATENT")
+    RETURN_NAMES = ("image", "samples_pass")
+    FUNCTION = "decode_gate"
+    CATEGORY = "h4_Live/Logic"
+
+    DESCRIPTION = """
+    🖼️ **H4 Latent Decode (Every N)**
+
+    **Latent-native loops:** Buffer the LATENT (not the IMAGE) with
+    `H4_ImageBuffer`, and let `H4_TrafficMerge` feed it back. This skips
+    the VAE decode + encode round-trip on every pass.
+
+    This node decodes only every N runs. On the other runs, the `image`
+    output is switched off, so Preview / Save nodes behind it are skipped.
+    """
+
+    @classmethod
+    def IS_CHANGED(cls, loop_name=None, **kwargs):
+        return state_fingerprint(loop_name)
+
+    def decode_gate(self, samples, vae, every_n, force_decode, loop_name=None):
+        node_id = "LatentDecodeGate"
+        count = get_state(loop_name)["loop_count"]
+        due = force_decode or count % max(1, every_n) == 0
+
+        if not due:
+            if ExecutionBlocker is not None:
+                _log(node_id, "⏭️ Skip decode | Run %s (every %s)", count, every_n, level=DEBUG)
+                return (ExecutionBlocker(None), samples)
+            _log(node_id, "⚠️ ExecutionBlocker not available in this ComfyUI. Decoding every run.", level=WARNING)
+
+        _log(node_id, "🖼️ Decoding | Run %s", count)
+        images = vae.decode(samples["samples"])
+        if len(images.shape) == 5:
+            # Video VAEs return [B, T, H, W, C]; flatten frames into the batch like VAEDecode.
+            images = images.reshape(-1, images.shape[-3], images.shape[-2], images.shape[-1])
+        return (images, samples)
     
 
 
@@ -27,3 +27,20 @@ ANY_TYPE = AnyType("*")
 
 # FAILSAFE: Using standard ComfyUI wildcard
 # ANY_TYPE = "*"
+
+# Shared widget for picking which loop namespace a node drives/reads.
+# Nodes sharing a name share one counter; different names loop independently.
+from .h4_core import DEFAULT_LOOP_NAME, DEFAULT_BUFFER_SLOT
+
+LOOP_NAME_INPUT = ("STRING", {
+    "default": DEFAULT_LOOP_NAME,
+    "multiline": False,
+    "tooltip": "Loop namespace. Nodes with the same name share one counter & orbit. Use different names to run independent loops on one server."
+})
+
+# Shared widget for picking which Universal Buffer slot a node writes/reads.
+SLOT_NAME_INPUT = ("STRING", {
+    "default": DEFAULT_BUFFER_SLOT,
+    "multiline": False,
+    "tooltip": "Buffer slot. The H4_ImageBuffer and H4_TrafficMerge of one loop must use the same slot name."
+})
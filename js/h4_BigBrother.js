@@ -54,6 +54,7 @@ app.registerExtension({
     _originalConsole: null, // Store original console methods
     _networkInterceptorInstalled: false, // Flag for network interceptor
     _isHandlingError: false, // Recursion protection for handleError
+    _serverLogSeq: 0, // Last /h4/logs sequence pulled into _logBuffer
 
     // --- Discombobulator Easter Egg State ---
     _glitchState: {
@@ -435,6 +436,30 @@ app.registerExtension({
         };
     },
 
+    /**
+     * Pull new backend log lines from the h4 ring buffer (/h4/logs) into the log buffer.
+     * Only lines newer than the last fetch are requested.
+     * @returns {Promise<void>}
+     */
+    async fetchServerLogs() {
+        try {
+            const since = this._serverLogSeq || 0;
+            const resp = await fetch(`/h4/logs?since=${since}&limit=500`);
+            if (!resp.ok) return;
+            const data = await resp.json();
+            for (const rec of data.logs || []) {
+                this._logBuffer.push({
+                    timestamp: new Date(rec.time * 1000).toISOString(),
+                    level: `PY-${rec.level}`,
+                    message: `[${rec.component}] ${rec.message}`
+                });
+            }
+            this._serverLogSeq = data.last_seq || since;
+        } catch (e) {
+            // Backend unreachable: the console capture is still there.
+        }
+    },
+
     /**
      * Get the last N log entries for display in error popup.
      * @param {number} count - Number of entries to retrieve
@@ -1421,8 +1446,9 @@ app.registerExtension({
             }
 
             // Only show popup if setting is enabled
+            // Pull the backend's recent h4 log lines first so the modal shows both sides.
             if (this._state.showErrorPopup) {
-                this.showDeathModal(errorMsg, traceback);
+                this.fetchServerLogs().finally(() => this.showDeathModal(errorMsg, traceback));
             }
         } finally {
             // Safety release
@@ -1,8 +1,18 @@
 import { app } from "../../scripts/app.js";
 import { ComfyWidgets } from "../../scripts/widgets.js";
+import { api } from "../../scripts/api.js";
 
 app.registerExtension({
     name: "h4.Live.SmartConsole",
+    setup() {
+        // Background (H4_CONSOLE_ASYNC) reports arrive after the node has already finished.
+        api.addEventListener("h4.smart_console", (e) => {
+            const node = app.graph._nodes.find((n) => String(n.id) === String(e.detail.node));
+            if (node?.log_widget && e.detail.text) {
+                node.log_widget.value = e.detail.text.join("\n");
+            }
+        });
+    },
     async beforeRegisterNodeDef(nodeType, nodeData, app) {
         if (nodeData.name === "H4_SmartConsole") {
             const onNodeCreated = nodeType.prototype.onNodeCreated;